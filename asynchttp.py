@@ -0,0 +1,185 @@
+"""
+Minimal asyncio HTTP/1.1 client for the challenge server.
+
+It only implements what solve.py needs: GET and POST with a plain text body
+against a single host, over a pool of keep-alive connections. The number of
+connections (and thereby the number of requests in flight) is capped by the
+pool size. Requests which are rejected with 429 Too Many Requests are
+retried with exponential backoff, but not before the delay the server asks
+for.
+"""
+
+import ssl
+import random
+import asyncio
+import urllib.parse
+
+MAX_RETRIES = 10
+RETRY_DELAY = 0.1
+
+
+class RetryError(OSError):
+    """ Raised when the server still rate limits a request after the last
+        retry.
+    """
+
+
+class Response:
+    """ Status code, headers and decoded body of a finished request.
+    """
+
+    def __init__(self, status, headers, content):
+        self.status_code = status
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self):
+        """ The body decoded with the charset given by the server.
+        """
+        charset = "utf-8"
+        content_type = self.headers.get("content-type", "")
+        for param in content_type.split(";")[1:]:
+            key, _, value = param.strip().partition("=")
+            if key.lower() == "charset" and value:
+                charset = value.strip('"')
+        return self.content.decode(charset, errors="replace")
+
+
+class ConnectionPool:
+    """ A pool of keep-alive connections to one host.
+
+        At most max_connections requests are in flight at the same time,
+        every further request waits until a connection is released.
+    """
+
+    def __init__(self, base_url, max_connections):
+        url = urllib.parse.urlsplit(base_url)
+        self.host = url.hostname
+        self.ssl = ssl.create_default_context() if url.scheme == "https" \
+            else None
+        self.port = url.port or (443 if self.ssl else 80)
+        self.base_path = url.path.rstrip("/")
+        self.host_header = url.netloc
+        self._idle = []
+        self._slots = asyncio.Semaphore(max_connections)
+
+    async def get(self, path):
+        """ Send a GET request for the given path and return the response.
+        """
+        return await self.request("GET", path)
+
+    async def post(self, path, data):
+        """ Send the given string as body of a POST request.
+        """
+        return await self.request("POST", path, data.encode("utf-8"))
+
+    async def request(self, method, path, body=None):
+        """ Send a request and retry it while the server answers with
+            429 Too Many Requests.
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            response = await self._request(method, path, body)
+            if response.status_code != 429:
+                return response
+            # Back off exponentially like the sync engine, but never retry
+            # earlier than the server asks for
+            delay = RETRY_DELAY * 2 ** attempt
+            try:
+                delay = max(delay,
+                            float(response.headers.get("retry-after", "")))
+            except ValueError:
+                pass
+            # Spread the retries, so rejected requests do not all come back
+            # at the same moment
+            await asyncio.sleep(delay + random.uniform(0, RETRY_DELAY))
+        raise RetryError("Too many 429 responses for " + path)
+
+    async def _request(self, method, path, body):
+        # Send a request over a pooled connection. If a reused connection
+        # was closed by the server in the meantime, the request is retried
+        # over a new connection.
+        async with self._slots:
+            while self._idle:
+                connection = self._idle.pop()
+                try:
+                    return await self._send(connection, method, path, body)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    continue
+            connection = await asyncio.open_connection(
+                self.host, self.port, ssl=self.ssl)
+            try:
+                return await self._send(connection, method, path, body)
+            except asyncio.IncompleteReadError as err:
+                raise ConnectionError(
+                    "Connection closed by the server") from err
+
+    async def close(self):
+        """ Close all idle connections.
+        """
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, ssl.SSLError):
+                pass
+
+    async def _send(self, connection, method, path, body):
+        reader, writer = connection
+        try:
+            head = method + " " + self.base_path + path + " HTTP/1.1\r\n" \
+                + "Host: " + self.host_header + "\r\n" \
+                + "Connection: keep-alive\r\n" \
+                + "Content-Length: " + str(len(body or b"")) + "\r\n\r\n"
+            writer.write(head.encode("latin-1") + (body or b""))
+            await writer.drain()
+            response, keep_alive = await self._read_response(reader)
+        except BaseException:
+            writer.close()
+            raise
+        if keep_alive:
+            self._idle.append(connection)
+        else:
+            writer.close()
+        return response
+
+    async def _read_response(self, reader):
+        status_line = await reader.readuntil(b"\r\n")
+        version, status = status_line.split(b" ", 2)[:2]
+        headers = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        keep_alive = version == b"HTTP/1.1"
+        connection = headers.get("connection", "").lower()
+        if connection == "close":
+            keep_alive = False
+        elif connection == "keep-alive":
+            keep_alive = True
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";")[0],
+                           16)
+                if size == 0:
+                    # Skip trailers up to the terminating empty line
+                    while await reader.readuntil(b"\r\n") != b"\r\n":
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            content = b"".join(chunks)
+        elif "content-length" in headers:
+            content = await reader.readexactly(
+                int(headers["content-length"]))
+        else:
+            content = await reader.read()
+            keep_alive = False
+
+        return Response(int(status), headers, content), keep_alive
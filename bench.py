@@ -0,0 +1,210 @@
+#!/bin/python
+"""
+Micro benchmarks for the solution files, without any network access.
+
+Every solver is run on seeded inputs from generators.py of growing size.
+After the warmup runs, a complete solver call, including decoding the
+challenge and encoding the token, is timed --repeat times per size.
+Sizes stop growing for a challenge once a single run takes longer than
+--max-time. From the timings, the empirical complexity is estimated by
+fitting the best matching of the usual complexity classes.
+
+    ./bench.py 3 7 16 --sizes 1000,10000,100000
+    ./bench.py --save-baseline baseline.json
+    ./bench.py --baseline baseline.json --threshold 0.25
+
+With --baseline, the script exits with code 1 if any median runtime got
+slower than the baseline by more than the threshold.
+"""
+
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import importlib
+import statistics
+from generators import GENERATORS
+from challenges import codec
+
+DEFAULT_SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+
+COMPLEXITIES = {
+    "O(1)": lambda n: 1,
+    "O(log n)": lambda n: math.log(n),
+    "O(n)": lambda n: n,
+    "O(n log n)": lambda n: n * math.log(n),
+    "O(n^2)": lambda n: n ** 2,
+    "O(n^3)": lambda n: n ** 3}
+
+
+def fit_complexity(timings):
+    """ Return the complexity class which fits the (size, seconds) pairs
+        best, together with the exponent of a power law fit.
+
+        Every class is fit as t = c * f(n) in log space. The class with the
+        smallest squared error wins.
+    """
+    if len({size for size, _ in timings}) < 2:
+        return None, None
+    log_sizes = [math.log(size) for size, _ in timings]
+    log_times = [math.log(max(seconds, 1e-9)) for _, seconds in timings]
+
+    mean_size = statistics.mean(log_sizes)
+    mean_time = statistics.mean(log_times)
+    exponent = sum((x - mean_size) * (y - mean_time)
+                   for x, y in zip(log_sizes, log_times)) \
+        / sum((x - mean_size) ** 2 for x in log_sizes)
+
+    best_name = None
+    best_error = None
+    for name, function in COMPLEXITIES.items():
+        values = [function(size) for size, _ in timings]
+        if min(values) <= 0:
+            # log n is 0 for a size of 1, which can not be fit in log space
+            continue
+        residuals = [log_time - math.log(value)
+                     for value, log_time in zip(values, log_times)]
+        offset = statistics.mean(residuals)
+        error = sum((r - offset) ** 2 for r in residuals)
+        if best_error is None or error < best_error:
+            best_name = name
+            best_error = error
+    return best_name, exponent
+
+
+def bench_challenge(number, settings):
+    """ Benchmark the solver of a single challenge. Returns a list of
+        (size, median, minimum) tuples, one for each finished size.
+    """
+    solver = codec.Solver(
+        importlib.import_module("challenges.chall" + str(number)))
+    results = []
+    for size in settings.sizes:
+        rng = random.Random(settings.seed * 1000 + number)
+        challenge_text, _ = GENERATORS[number](rng, size)
+
+        timings = []
+        for run in range(settings.warmup + settings.repeat):
+            start = time.perf_counter()
+            solver(challenge_text)
+            seconds = time.perf_counter() - start
+            if run >= settings.warmup:
+                timings.append(seconds)
+            if seconds > settings.max_time:
+                # Too slow to repeat, a single run has to do
+                timings = timings or [seconds]
+                break
+
+        median = statistics.median(timings)
+        results.append((size, median, min(timings)))
+        sys.stdout.write(
+            "chall{:<3} n={:<10} median {:>12.6f}ms  min {:>12.6f}ms  "
+            "{:>14.0f} elem/s\n".format(
+                number, size, median * 1000, min(timings) * 1000,
+                size / median if median else float("inf")))
+        sys.stdout.flush()
+        if median > settings.max_time:
+            break
+    return results
+
+
+def compare_baseline(baseline, results, threshold):
+    """ Print every size which got slower than the baseline by more than the
+        threshold. Returns the number of regressions.
+    """
+    regressions = 0
+    for number, timings in results.items():
+        known = baseline.get(str(number), {})
+        for size, median, _ in timings:
+            if str(size) not in known:
+                continue
+            reference = known[str(size)]
+            if median > reference * (1 + threshold):
+                regressions += 1
+                sys.stdout.write(
+                    "Regression in chall{} at n={}: {:.6f}ms instead of "
+                    "{:.6f}ms (+{:.1f}%)\n".format(
+                        number, size, median * 1000, reference * 1000,
+                        (median / reference - 1) * 100))
+    return regressions
+
+
+def parse_arguments(argv):
+    """ Parse the command line of the benchmark.
+    """
+    parser = argparse.ArgumentParser(
+        description="Micro benchmarks for the challenge solvers.")
+    parser.add_argument("challenges", nargs="*", type=int,
+                        help="challenges to benchmark (default: all)")
+    parser.add_argument("--sizes", default=None,
+                        help="comma separated input sizes (default: "
+                             + ",".join(str(n) for n in DEFAULT_SIZES) + ")")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="timed runs per size (default: 5)")
+    parser.add_argument("--warmup", type=int, default=1,
+                        help="untimed runs per size (default: 1)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the input generators (default: 0)")
+    parser.add_argument("--max-time", type=float, default=1.0,
+                        help="stop growing the size once a run takes longer "
+                             "than this many seconds (default: 1)")
+    parser.add_argument("--save-baseline", metavar="FILE",
+                        help="store the median runtimes in FILE")
+    parser.add_argument("--baseline", metavar="FILE",
+                        help="compare the median runtimes against FILE")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed slowdown against the baseline "
+                             "(default: 0.2 = 20%%)")
+    settings = parser.parse_args(argv)
+
+    settings.sizes = DEFAULT_SIZES if settings.sizes is None else \
+        [int(size) for size in settings.sizes.split(",")]
+    if min(settings.sizes) < 1:
+        parser.error("the sizes must be at least 1")
+    unknown = [n for n in settings.challenges if n not in GENERATORS]
+    if unknown:
+        parser.error("no generator for challenge "
+                     + ", ".join(str(n) for n in unknown))
+    if not settings.challenges:
+        settings.challenges = sorted(GENERATORS)
+    return settings
+
+
+def main():
+    settings = parse_arguments(sys.argv[1:])
+    if hasattr(sys, "set_int_max_str_digits"):
+        # Challenge 6 works on integers with far more than 4300 digits
+        sys.set_int_max_str_digits(0)
+
+    results = {}
+    for number in settings.challenges:
+        try:
+            results[number] = bench_challenge(number, settings)
+        except Exception as err:
+            sys.stdout.write("chall{:<3} failed: {!r}\n".format(number, err))
+            continue
+        complexity, exponent = fit_complexity(
+            [(size, median) for size, median, _ in results[number]])
+        if complexity is not None:
+            sys.stdout.write("chall{:<3} fits {} (exponent {:.2f})\n\n".format(
+                number, complexity, exponent))
+
+    if settings.save_baseline:
+        baseline = {str(number): {str(size): median
+                                  for size, median, _ in timings}
+                    for number, timings in results.items()}
+        with open(settings.save_baseline, "w") as baseline_file:
+            json.dump(baseline, baseline_file, indent=2)
+
+    if settings.baseline:
+        with open(settings.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        if compare_baseline(baseline, results, settings.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
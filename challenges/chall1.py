@@ -3,11 +3,9 @@ This solves Coding Challenge 01:
 Read the contents of the challenge interface. Return the content back in json.
 """
 
-import json
+INPUT = "text"
 
 
 def solve(challenge):
     """Solving Challenge"""
-    payload = {"token": challenge}
-    payload = json.dumps(payload)
-    return payload
+    return challenge
@@ -4,15 +4,10 @@ From a plaintext string containing a float, convert that string
 to a float data type
 """
 
-import json
-import sys
+INPUT = "float"
 
 
-def solve(data):
-    """Solving from plaintext data to json token"""
-    # Lol ik this is the dumb hacky way.
-    solution = float(data)
-
-    payload = {"token": solution}
-    payload = json.dumps(payload)
-    return payload
+def solve(number):
+    """Solving from float to token"""
+    # The runner already converted the challenge text to a float
+    return number
@@ -1,28 +1,123 @@
 """
 This solves Coding Challenge 11:
 Validate brackets in mathematical formulas
+
+The formula is checked in chunks of bytes, so it can also be fed while it is
+still being received. bytes.translate() drops everything but the brackets
+of every chunk. With a single bracket type, the depth after the chunk is
+found by counting. The lowest depth inside the chunk is only needed if the
+chunk closes more brackets than were open before it. It is found with NumPy,
+or else by removing matched pairs with bytes.replace() first. To check
+several bracket types, add them to BRACKETS; they are then matched with a
+stack.
 """
 
-import json
+from itertools import accumulate
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+INPUT = "text"
+CHUNK_SIZE = 1 << 16
+REDUCE_ROUNDS = 8
+BRACKETS = {"(": ")"}
+
+
+class BracketValidator:
+    """Validate the brackets of a formula fed in chunks of bytes or text"""
+
+    def __init__(self, brackets=None):
+        if brackets is None:
+            brackets = BRACKETS
+        self.opening = {ord(o) for o in brackets}
+        self.matching = {ord(c): ord(o) for o, c in brackets.items()}
+        self.not_brackets = bytes(
+            set(range(256)) - self.opening - set(self.matching))
+        self.steps = [0] * 256
+        for byte in self.opening:
+            self.steps[byte] = 1
+        for byte in self.matching:
+            self.steps[byte] = -1
+        if len(brackets) > 1:
+            self.stack = []
+        else:
+            self.stack = None
+            (opening, closing), = brackets.items()
+            self.pair = (opening + closing).encode()
+        self.depth = 0
+        self.valid = True
+
+    def feed(self, chunk):
+        """Check the next chunk, return False once the formula is invalid"""
+        if not self.valid:
+            return False
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        brackets = chunk.translate(None, self.not_brackets)
+        if not brackets:
+            return True
+        if self.stack is None:
+            closed = brackets.count(self.pair[1])
+            # The depth can only drop below zero if there are more closing
+            # brackets in the chunk than brackets open before it
+            if closed > self.depth and \
+                    self.depth + self.lowest_depth(brackets) < 0:
+                self.valid = False
+            self.depth += len(brackets) - 2 * closed
+        else:
+            self.feed_stack(brackets)
+        return self.valid
+
+    def lowest_depth(self, brackets):
+        """Return the lowest depth inside the brackets, starting at 0"""
+        if numpy is not None:
+            steps = numpy.frombuffer(brackets, dtype=numpy.uint8) \
+                == self.pair[0]
+            depths = numpy.cumsum(steps.astype(numpy.int64) * 2 - 1)
+            return min(int(depths.min()), 0)
+        # Removing matched pairs keeps the lowest depth. Formulas which are
+        # not nested deeply are reduced to the unmatched brackets quickly.
+        for _ in range(REDUCE_ROUNDS):
+            reduced = brackets.replace(self.pair, b"")
+            if len(reduced) == len(brackets):
+                break
+            brackets = reduced
+        return min(accumulate(map(self.steps.__getitem__, brackets),
+                              initial=0))
+
+    def feed_stack(self, brackets):
+        """Match the brackets of several types with the open ones"""
+        stack = self.stack
+        for byte in brackets:
+            if byte in self.opening:
+                stack.append(byte)
+            elif not stack or stack.pop() != self.matching[byte]:
+                self.valid = False
+                break
+        self.depth = len(stack)
+
+    def finish(self):
+        """Return if the whole formula fed so far is valid"""
+        return self.valid and self.depth == 0
+
+
+def iter_chunks(data, chunk_size=CHUNK_SIZE):
+    """Split the formula into chunks"""
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+
+
+def validate(chunks, brackets=None):
+    """Validate a formula given as iterable of chunks"""
+    validator = BracketValidator(brackets)
+    for chunk in chunks:
+        if not validator.feed(chunk):
+            return False
+    return validator.finish()
 
 
 def solve(data):
-    """Solving from plaintext data to json token"""
-
-    valid = True
-    brackets = 0
-    for character in data:
-        if character == "(":
-            brackets += 1
-        elif character == ")":
-            brackets -= 1
-        if brackets < 0:
-            valid = False
-            break
-
-    if brackets != 0:
-        valid = False
-
-    payload = {
-        "token": valid}
-    return payload
+    """Solving from plaintext data to token"""
+    return validate(iter_chunks(data))
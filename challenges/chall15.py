@@ -2,20 +2,28 @@
 This solves Coding Challenge 15:
 Check if a string is a palindrome. Ignore all punctuation.#
 Only A-Za-z are relevant for the check.
+
+The word is encoded to ASCII, which drops all other characters, and a single
+bytes.translate() lowercases the letters and deletes everything else. The
+letters are compared with a reversed memoryview of themselves, so no
+reversed copy is made and the comparison stops at the first difference.
 """
 
-import json
+import string
+
+INPUT = "json"
+LOWERCASE = bytes.maketrans(string.ascii_uppercase.encode(),
+                            string.ascii_lowercase.encode())
+NOT_LETTERS = bytes(set(range(128)) - set(string.ascii_letters.encode()))
+
+
+def is_palindrome(word):
+    """Check if the letters A-Za-z of a word form a palindrome"""
+    letters = word.encode("ascii", "ignore").translate(LOWERCASE, NOT_LETTERS)
+    view = memoryview(letters)
+    return view == view[::-1]
 
 
-def solve(challenge):
-    """Solving from json data to json token"""
-    data = json.loads(challenge)
-    text = data["word"].lower()
-    for character in " ,;'?!.:-_`´\"§$%&/()=#\n":
-        text = text.replace(character, '')
-    solution = False
-    if text == text[::-1]:
-        solution = True
-    payload = {"token": solution}
-    payload = json.dumps(payload)
-    return payload
+def solve(data):
+    """Solving from json data to token"""
+    return is_palindrome(data["word"])
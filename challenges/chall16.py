@@ -1,26 +1,64 @@
 """
 This solves Coding Challenge 16:
 Calculate the longest consecutive subsequence of numbers in an array.
+
+Every run is walked once from its smallest value, over the set of distinct
+values, so duplicates in the list cost nothing. Large lists of 64 bit
+integers are parsed into a NumPy array if NumPy is installed: the run
+lengths follow from the gaps between the sorted distinct values, without
+any loop in Python.
 """
 
 import json
+from challenges import jsonstream
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+INPUT = "text"
+NUMPY_THRESHOLD = 1 << 16
+
+
+def longest_run(nlist):
+    """Find the longest run of consecutive values in O(n)"""
+    values = set(nlist)
+    longest = 0
+    for start in values:
+        if start - 1 not in values:
+            end = start + 1
+            while end in values:
+                end += 1
+            if end - start > longest:
+                longest = end - start
+    return longest
+
+
+def longest_run_numpy(values):
+    """Find the longest run of consecutive values in a NumPy array"""
+    if len(values) == 0:
+        return 0
+    values = numpy.sort(values)
+    # Sorting and dropping repeats is faster than numpy.unique(), which
+    # uses a hash table in newer NumPy versions
+    values = values[numpy.concatenate(([True], values[1:] != values[:-1]))]
+    # Indices where a new run starts, and one past the last value
+    starts = numpy.flatnonzero(numpy.diff(values) != 1) + 1
+    bounds = numpy.concatenate(([0], starts, [len(values)]))
+    return int(numpy.diff(bounds).max())
 
 
 def solve(challenge):
-    """Solving from json data to json token"""
-    data = json.loads(challenge)
-    nlist = data["list"]
-    n = len(nlist)
-    s = set(nlist)
-    ans = 0
-    for ele in nlist:
-        s.add(ele)
-    for i in range(n):
-        if (nlist[i]-1) not in s:
-            j = nlist[i]
-            while j in s:
-                j += 1
-            ans = max(ans, j - nlist[i])
-    payload = {"token": ans}
-    payload = json.dumps(payload)
-    return payload
+    """Solving from json data to token"""
+    ans = None
+    if numpy is not None and len(challenge) >= NUMPY_THRESHOLD:
+        try:
+            ans = longest_run_numpy(
+                jsonstream.decode_int64_array(challenge, "list"))
+        except ValueError:
+            ans = None
+    if ans is None:
+        data = json.loads(challenge)
+        ans = longest_run(data["list"])
+    return ans
@@ -1,22 +1,38 @@
 """
 This solves Coding Challenge 17:
 Check if a list contains duplicates.
+
+Large challenges are decoded piece by piece, which stops as soon as a piece
+contains a duplicate.
 """
 
 import json
+from challenges import jsonstream
 
+INPUT = "text"
 
-def solve(challenge):
-    """Solving from json data to json token"""
-    list = json.loads(challenge)['list']
-    checklist = []
-    solution = False
-    for item in list:
-        if item in checklist:
-            solution = True
-            break
-        checklist.append(item)
 
-    payload = {"token": solution}
-    payload = json.dumps(payload)
-    return payload
+def has_duplicates(chunks):
+    """Check the chunks of a list for duplicates, stop at the first one"""
+    seen = set()
+    count = 0
+    for chunk in chunks:
+        seen.update(chunk)
+        count += len(chunk)
+        if len(seen) != count:
+            return True
+    return False
+
+
+def solve(challenge):
+    """Solving from json data to token"""
+    solution = None
+    if len(challenge) >= jsonstream.STREAM_THRESHOLD:
+        try:
+            solution = has_duplicates(
+                jsonstream.iter_array_chunks(challenge, 'list'))
+        except ValueError:
+            solution = None
+    if solution is None:
+        solution = has_duplicates([json.loads(challenge)['list']])
+    return solution
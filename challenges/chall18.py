@@ -1,27 +1,59 @@
 """
 This solves Coding Challenge 18:
 Check if a list contains duplicates with distance of k to checked object.
+
+By default, two items are duplicates if their values differ by at most k.
+Values are put in buckets of width k + 1, so every value only has to be
+compared with the values in its own and the two neighbouring buckets.
+If the distance is meant as the distance of the indices of two equal items
+instead, set INDEX_DISTANCE to True.
 """
 
-import json
-
-
-def solve(challenge):
-    """Solving from json data to json token"""
-    jsonobj = json.loads(challenge)
-    list = jsonobj['list']
-    k = jsonobj['k']
-    checklist = []
-    solution = False
-    for item in list:
-        for i in range(item-k, item+k+1):
-            if i in checklist:
-                solution = True
-                break
-        if solution:
-            break
-        checklist.append(item)
-
-    payload = {"token": solution}
-    payload = json.dumps(payload)
-    return payload
+INPUT = "list_k"
+INDEX_DISTANCE = False
+
+
+def has_near_values(nlist, k):
+    """Check for two values that differ by at most k in O(n)"""
+    if k < 0:
+        return False
+    width = k + 1
+    buckets = {}
+    for item in nlist:
+        bucket = item // width
+        # Two values in the same bucket are at most k apart, so every
+        # bucket never holds more than one value
+        if bucket in buckets:
+            return True
+        lower = buckets.get(bucket - 1)
+        if lower is not None and item - lower <= k:
+            return True
+        upper = buckets.get(bucket + 1)
+        if upper is not None and upper - item <= k:
+            return True
+        buckets[bucket] = item
+    return False
+
+
+def has_near_duplicates(nlist, k):
+    """Check for two equal values at most k indices apart in O(n)"""
+    if k < 1:
+        return False
+    # Holds the last k items, so memory is bound by the window size
+    window = set()
+    for index, item in enumerate(nlist):
+        if item in window:
+            return True
+        window.add(item)
+        if index >= k:
+            window.discard(nlist[index - k])
+    return False
+
+
+def solve(nlist, k):
+    """Solving from list and k to token"""
+    if INDEX_DISTANCE:
+        solution = has_near_duplicates(nlist, k)
+    else:
+        solution = has_near_values(nlist, k)
+    return solution
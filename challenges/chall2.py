@@ -1,21 +1,39 @@
 """
 This solves Coding Challenge 02:
 Find an element in a list. Return the index of this element.
+
+Large challenges are decoded piece by piece, which stops at the first piece
+that contains the element.
 """
 
 import json
+from challenges import jsonstream
+
+INPUT = "text"
+
+
+def find_index(chunks, number):
+    """Find the first index of number in the chunks of a list, else -1"""
+    offset = 0
+    for chunk in chunks:
+        try:
+            return offset + chunk.index(number)
+        except ValueError:
+            offset += len(chunk)
+    return -1
 
 
 def solve(data):
-    """Solving from json data to json token"""
-    challenge = json.loads(data)
-    number = challenge["k"]
-    liste = challenge["list"]
-    index = -1
-    for i in liste:
-        if i == number:
-            index = liste.index(i)
-            break
-    retval = {"token": index}
-    retval = json.dumps(retval)
-    return retval
+    """Solving from json data to token"""
+    index = None
+    if len(data) >= jsonstream.STREAM_THRESHOLD:
+        try:
+            number = jsonstream.decode_value(data, "k")
+            index = find_index(
+                jsonstream.iter_array_chunks(data, "list"), number)
+        except ValueError:
+            index = None
+    if index is None:
+        challenge = json.loads(data)
+        index = find_index([challenge["list"]], challenge["k"])
+    return index
@@ -1,17 +1,67 @@
 """
 This solves Coding Challenge 03:
 Find the k-largest element in a list.
+
+Near either end of the list, a bounded heap keeps only the k largest (or
+n - k + 1 smallest) items. Large lists of 64 bit integers are parsed into
+NumPy and selected with numpy.partition(); everything else is sorted.
 """
 
 import json
+import heapq
+from challenges import jsonstream
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+INPUT = "text"
+HEAP_FRACTION = 16
+NUMPY_THRESHOLD = 1 << 16
+
+
+def parse_int64(data):
+    """Parse k and the list into a NumPy array, None if it does not fit"""
+    try:
+        k = jsonstream.decode_value(data, 'k')
+        values = jsonstream.decode_int64_array(data, 'list')
+    except ValueError:
+        return None, None
+    if len(values) == 0:
+        return None, None
+    return k, values
+
+
+def select_numpy(values, k):
+    """Select the k-largest element of a NumPy array in O(n)"""
+    index = len(values) - k
+    if k < 1 or index < 0:
+        raise IndexError("k is out of range")
+    return int(numpy.partition(values, index)[index])
+
+
+def select(nlist, k):
+    """Select the k-largest element of a list with a heap or a sort"""
+    length = len(nlist)
+    if k < 1 or k > length:
+        raise IndexError("k is out of range")
+    if k * HEAP_FRACTION <= length:
+        return heapq.nlargest(k, nlist)[-1]
+    if (length - k + 1) * HEAP_FRACTION <= length:
+        return heapq.nsmallest(length - k + 1, nlist)[-1]
+    nlist.sort()
+    return nlist[length - k]
 
 
 def solve(data):
-    """Solving from json data to json token"""
-    challenge = json.loads(data)
-    k = challenge['k']
-    nlist = sorted(challenge['list'], reverse=True)
-    retval = nlist[k-1]
-    payload = {"token": retval}
-    payload = json.dumps(payload)
-    return payload
+    """Solving from json data to token"""
+    values = None
+    if numpy is not None and len(data) >= NUMPY_THRESHOLD:
+        k, values = parse_int64(data)
+    if values is not None:
+        retval = select_numpy(values, k)
+    else:
+        challenge = json.loads(data)
+        retval = select(challenge['list'], challenge['k'])
+    return retval
@@ -1,17 +1,91 @@
 """
 This solves Coding Challenge 04:
 Rotate a list by k elements to the right.
+
+A flat list of numbers is never decoded. The two parts of the rotated list
+are cut from the text of the challenge at the right comma and written to
+the token in swapped order. Other lists are decoded and both parts are
+encoded separately, so the rotated list is never built.
 """
 
 import json
+from challenges import codec, jsonstream
+
+INPUT = "text"
+CHUNK_SIZE = 1 << 16
+WHITESPACE = " \t\r\n"
+
+
+def find_separator(text, count, start, end):
+    """ Return the index of the count-th comma between start and end of the
+        text, counted from 1.
+    """
+    while True:
+        chunk_end = min(start + CHUNK_SIZE, end)
+        found = text.count(",", start, chunk_end)
+        if found >= count:
+            break
+        count -= found
+        start = chunk_end
+    index = start - 1
+    for _ in range(count):
+        index = text.find(",", index + 1, chunk_end)
+    return index
+
+
+def strip_span(text, start, end):
+    """Move start and end of a span of the text past any whitespace"""
+    while start < end and text[start] in WHITESPACE:
+        start += 1
+    while end > start and text[end - 1] in WHITESPACE:
+        end -= 1
+    return start, end
+
+
+def rotate_text(text, start, end, k):
+    """ Rotate the items of a flat JSON array between start and end of the
+        text. Returns the parts of the encoded rotated array.
+    """
+    start, end = strip_span(text, start, end)
+    if start == end:
+        return ["[]"]
+    length = text.count(",", start, end) + 1
+    shift = k % length
+    if shift == 0:
+        return ["[", text[start:end], "]"]
+    cut = find_separator(text, length - shift, start, end)
+    head_start, head_end = strip_span(text, cut + 1, end)
+    tail_start, tail_end = strip_span(text, start, cut)
+    return ["[", text[head_start:head_end], ", ",
+            text[tail_start:tail_end], "]"]
+
+
+def rotate_list(wlist, k):
+    """Encode a rotated list without building it"""
+    if not wlist:
+        return "[]"
+    shift = k % len(wlist)
+    if shift == 0:
+        return json.dumps(wlist)
+    cut = len(wlist) - shift
+    return "[" + json.dumps(wlist[cut:])[1:-1] + ", " \
+        + json.dumps(wlist[:cut])[1:-1] + "]"
 
 
 def solve(data):
-    """Solving from json data to json token"""
-    challenge = json.loads(data)
-    k = challenge['k']
-    wlist = challenge['list']
-    wlist = wlist[(-k % len(wlist)):] + wlist[:(-k % len(wlist))]
-    payload = {"token": wlist}
-    payload = json.dumps(payload)
-    return payload
+    """Solving from json data to token"""
+    parts = None
+    try:
+        k = jsonstream.decode_value(data, 'k')
+        start, end = jsonstream.array_span(data, 'list')
+        # Only numbers can be cut at every comma
+        if type(k) is int and data.find('"', start, end) == -1 \
+                and data.find('[', start, end) == -1 \
+                and data.find('{', start, end) == -1:
+            parts = rotate_text(data, start, end, k)
+    except ValueError:
+        parts = None
+    if parts is None:
+        challenge = json.loads(data)
+        parts = [rotate_list(challenge['list'], challenge['k'])]
+    return codec.RawJSON(*parts)
@@ -1,30 +1,74 @@
 """
-This solves Coding Challenge 04:
+This solves Coding Challenge 05:
 Evaluate a postfix notation string
+
+The input is split into tokens in chunks of about CHUNK_SIZE characters, so
+no token list of the whole expression is built. Values stay integers as
+long as every division is exact, and become a Fraction otherwise, so no
+precision is lost before the result is truncated to an integer. Set
+FLOOR_DIVISION to True to evaluate "/" as integer division instead.
 """
 
-import json
+import operator
+from fractions import Fraction
 
+INPUT = "text"
+CHUNK_SIZE = 1 << 16
+FLOOR_DIVISION = False
 
-def solve(data):
-    """Solving from plain text to json token"""
-    ops = {
-        "+": (lambda a, b: a + b),
-        "-": (lambda a, b: a - b),
-        "*": (lambda a, b: a * b),
-        "/": (lambda a, b: a / b)}
-
-    tokens = data.split(" ")
+
+def divide(arg1, arg2):
+    """Divide exactly, as integer where possible"""
+    if type(arg1) is int and type(arg2) is int and arg1 % arg2 == 0:
+        return arg1 // arg2
+    return Fraction(arg1, arg2)
+
+
+def iter_tokens(data, chunk_size=CHUNK_SIZE):
+    """Yield the whitespace separated tokens of data in chunks"""
+    start = 0
+    length = len(data)
+    while start < length:
+        end = start + chunk_size
+        if end < length:
+            cut = data.rfind(" ", start, end)
+            # A token longer than the chunk is taken as a whole
+            end = cut if cut > start else data.find(" ", end)
+            if end == -1:
+                end = length
+        yield data[start:end].split()
+        start = end + 1
+
+
+def evaluate(data, division=divide):
+    """Evaluate a postfix expression"""
     stack = []
-    for token in tokens:
-        if token in ops:
-            arg2 = stack.pop()
-            arg1 = stack.pop()
-            result = ops[token](arg1, arg2)
-            stack.append(result)
-        else:
-            stack.append(int(token))
-    solution = int(stack.pop())
-    payload = {"token": solution}
-    payload = json.dumps(payload)
-    return payload
+    push = stack.append
+    pop = stack.pop
+    for tokens in iter_tokens(data):
+        for token in tokens:
+            # Compared one by one, which is faster than a dispatch table
+            if token == "+":
+                arg2 = pop()
+                stack[-1] += arg2
+            elif token == "-":
+                arg2 = pop()
+                stack[-1] -= arg2
+            elif token == "*":
+                arg2 = pop()
+                stack[-1] *= arg2
+            elif token == "/":
+                arg2 = pop()
+                stack[-1] = division(stack[-1], arg2)
+            else:
+                push(int(token))
+    return int(pop())
+
+
+def solve(data):
+    """Solving from plain text to token"""
+    if FLOOR_DIVISION:
+        solution = evaluate(data, operator.floordiv)
+    else:
+        solution = evaluate(data)
+    return solution
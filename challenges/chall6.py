@@ -1,18 +1,46 @@
 """
 This solves Coding Challenge 06:
 Convert integer to binary string.
+
+int() converts long decimal strings in quadratic time and refuses more than
+4300 digits in newer Python versions. So the digits are split in halves
+until the parts are short, and the parts are joined with multiplications by
+powers of ten, which profit from Karatsuba multiplication. The binary string
+is then written by format() in linear time.
 """
 
-import json
+INPUT = "text"
+CHUNK_DIGITS = 2048
+
+
+def parse_decimal(digits, powers):
+    """Convert a string of decimal digits to an int by divide and conquer"""
+    if len(digits) <= CHUNK_DIGITS:
+        return int(digits)
+    split = len(digits) // 2
+    low_digits = len(digits) - split
+    power = powers.get(low_digits)
+    if power is None:
+        power = powers[low_digits] = 10 ** low_digits
+    return parse_decimal(digits[:split], powers) * power \
+        + parse_decimal(digits[split:], powers)
+
+
+def to_binary(data):
+    """Convert a decimal integer string to a binary string"""
+    digits = data.strip()
+    sign = ""
+    if digits[:1] in ("-", "+"):
+        sign = "-" if digits[0] == "-" else ""
+        digits = digits[1:]
+    if not digits.isascii() or not digits.isdigit():
+        raise ValueError("Not a decimal integer: " + data[:32])
+    number = parse_decimal(digits, {})
+    if number == 0:
+        sign = ""
+    return sign + format(number, "b")
 
 
 def solve(data):
-    """Solving from plain text to json token"""
-    i = int(data)
-    s = ""
-    while i:
-        s = str(i % 2) + s
-        i = i >> 1
-    payload = {"token": s}
-    payload = json.dumps(payload)
-    return payload
+    """Solving from plain text to token"""
+    return to_binary(data)
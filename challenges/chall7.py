@@ -1,24 +1,88 @@
 """
 This solves Coding Challenge 07:
 Given a number k, find two numbers in a list that add to k.
+
+The solution is the pair [i, j] with the smallest i, and the smallest j for
+that i. Both indices are distinct. Large lists of 64 bit integers are
+parsed straight into a NumPy array and solved there if NumPy is installed.
 """
 
 import json
+from challenges import jsonstream
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+INPUT = "text"
+NUMPY_THRESHOLD = 1 << 16
+
+
+def solve_hashed(k, nlist):
+    """Find the pair with a map from every value to its first index"""
+    # Filled from the back, so the first index of every value wins
+    first_index = dict(zip(reversed(nlist), range(len(nlist) - 1, -1, -1)))
+
+    for i, value in enumerate(nlist):
+        j = first_index.get(k - value)
+        if j is None:
+            continue
+        if j != i:
+            return [i, j]
+        # The value is its own complement, so it has to appear twice
+        try:
+            return [i, nlist.index(value, i + 1)]
+        except ValueError:
+            continue
+    return []
+
+
+def solve_numpy(k, values):
+    """Find the pair by sweeping a stable sorted copy of the list"""
+    order = numpy.argsort(values, kind="stable")
+    sorted_values = values[order]
+    # The complements of the sorted values are sorted in reverse, so both
+    # searches walk through the list like two pointers from both ends.
+    complements = (k - sorted_values)[::-1]
+    left = numpy.searchsorted(sorted_values, complements, side="left")[::-1]
+    right = numpy.searchsorted(sorted_values, complements,
+                               side="right")[::-1]
+    # A value can only be its own complement if it appears twice
+    valid = right - left >= 1 + (k - sorted_values == sorted_values)
+    if not valid.any():
+        return []
+    positions = numpy.flatnonzero(valid)
+    position = positions[numpy.argmin(order[positions])]
+    i = int(order[position])
+    j = int(order[left[position]])
+    if j == i:
+        j = int(order[left[position] + 1])
+    return [i, j]
+
+
+def parse_int64(data):
+    """Parse k and the list into a NumPy array, None if they could overflow"""
+    try:
+        k = jsonstream.decode_value(data, 'k')
+        values = jsonstream.decode_int64_array(data, 'list')
+    except ValueError:
+        return None, None
+    # k - value has to fit into 64 bits as well
+    if not isinstance(k, int) or abs(k) >= 2 ** 62 or len(values) == 0 \
+            or values.min() <= -2 ** 62 or values.max() >= 2 ** 62:
+        return None, None
+    return k, values
 
 
 def solve(data):
-    """Solving from json data to json token"""
-    challenge = json.loads(data)
-    k = challenge['k']
-    nlist = challenge['list']
-    solution = []
-    for i in range(len(nlist)):
-        for j in range(len(nlist)):
-            if nlist[i] + nlist[j] == k:
-                solution.append(i)
-                solution.append(j)
-        if not len(solution) == 0:
-            break
-    payload = {"token": solution}
-    payload = json.dumps(payload)
-    return payload
+    """Solving from json data to token"""
+    values = None
+    if numpy is not None and len(data) >= NUMPY_THRESHOLD:
+        k, values = parse_int64(data)
+    if values is not None:
+        solution = solve_numpy(k, values)
+    else:
+        challenge = json.loads(data)
+        solution = solve_hashed(challenge['k'], challenge['list'])
+    return solution
@@ -1,37 +1,99 @@
 """
 This solves Coding Challenge 08:
 Given a number k, find four numbers in a list that add to k.
+
+Short lists are searched with two pointers over a sorted copy that keeps
+the original indices. Longer lists are searched with an index of pair sums,
+which needs O(n^2) instead of O(n^3) time. The index holds at most about
+MAX_PAIR_SUMS sums: a full index is checked against all remaining pairs
+and started over, so the memory stays bounded for wide value ranges.
 """
 
-import json
-
-
-def solve(data):
-    """Solving from json data to json token"""
-    challenge = json.loads(data)
-    k = challenge['k']
-    nlist = challenge['list']
-
-    def evalsum(nlist, k):
-        slist = sorted(nlist)
-        for i in range(len(slist) - 3):
-            for j in range(i + 1, len(slist) - 2):
-                n = j + 1
-                m = len(slist) - 1
-                while n < m:
-                    if slist[i] + slist[j] + slist[n] + slist[m] < k:
-                        n += 1
-                    elif slist[i] + slist[j] + slist[n] + slist[m] > k:
-                        m -= 1
-                    else:
-                        solution = [nlist.index(
-                            slist[i]),
-                            nlist.index(slist[j]),
-                            nlist.index(slist[n]),
-                            nlist.index(slist[m])]
-                        return solution
-    # enddef evalsum
-
-    payload = {"token": evalsum(nlist, k)}
-    payload = json.dumps(payload)
-    return payload
+INPUT = "list_k"
+PAIR_INDEX_THRESHOLD = 50
+MAX_PAIR_SUMS = 1 << 20
+
+
+def solve_sorted(nlist, k):
+    """Search with two pointers over the sorted values, pruned by bounds"""
+    slist = sorted((value, index) for index, value in enumerate(nlist))
+    values = [value for value, _ in slist]
+    length = len(values)
+    for i in range(length - 3):
+        if i > 0 and values[i] == values[i - 1]:
+            continue
+        if values[i] + values[i + 1] + values[i + 2] + values[i + 3] > k:
+            break
+        if values[i] + values[-3] + values[-2] + values[-1] < k:
+            continue
+        for j in range(i + 1, length - 2):
+            if j > i + 1 and values[j] == values[j - 1]:
+                continue
+            partial = values[i] + values[j]
+            if partial + values[j + 1] + values[j + 2] > k:
+                break
+            if partial + values[-2] + values[-1] < k:
+                continue
+            n = j + 1
+            m = length - 1
+            while n < m:
+                current = partial + values[n] + values[m]
+                if current < k:
+                    n += 1
+                elif current > k:
+                    m -= 1
+                else:
+                    return [slist[i][1], slist[j][1],
+                            slist[n][1], slist[m][1]]
+    return None
+
+
+def find_complement(pair_sums, nlist, k, split):
+    """Find a pair (split, d) whose complement sum is in the index"""
+    rest = k - nlist[split]
+    tail = nlist[split + 1:]
+    # Checking the whole tail at once keeps the loop in C while nothing
+    # is found
+    if pair_sums.keys().isdisjoint(map(rest.__sub__, tail)):
+        return None
+    length = len(nlist)
+    for d, value in enumerate(tail, split + 1):
+        pair = pair_sums.get(rest - value)
+        if pair is not None:
+            b, a = divmod(pair, length)
+            return [a, b, split, d]
+    return None
+
+
+def solve_pair_index(nlist, k):
+    """Search with an index of the sums of pairs left of a split"""
+    # Pairs (a, b) with a < b < split are indexed by their sum, the pairs
+    # (split, d) with d > split look up their complement. So both pairs
+    # never share an index. A pair is stored as b * length + a.
+    pair_sums = {}
+    length = len(nlist)
+    for split in range(1, length - 1):
+        solution = find_complement(pair_sums, nlist, k, split)
+        if solution is not None:
+            return solution
+        pair_sums.update(zip(
+            map(nlist[split].__add__, nlist[:split]),
+            range(split * length, split * length + split)))
+        if len(pair_sums) > MAX_PAIR_SUMS:
+            # Check the indexed pairs against all pairs right of the split
+            # and start over with an empty index, which bounds the memory
+            for later in range(split + 1, length - 1):
+                solution = find_complement(pair_sums, nlist, k, later)
+                if solution is not None:
+                    return solution
+            pair_sums.clear()
+    return None
+
+
+def solve(nlist, k):
+    """Solving from list and k to token"""
+    if len(nlist) < PAIR_INDEX_THRESHOLD:
+        solution = solve_sorted(nlist, k)
+    else:
+        solution = solve_pair_index(nlist, k)
+    return solution
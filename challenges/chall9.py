@@ -4,26 +4,27 @@ Given a number k, find two numbers in a list that add to k and return the two
 indices that match this requirement AND are the closest together in the list.
 """
 
-import json
-import sys
+INPUT = "list_k"
 
 
-def solve(data):
-    """Solving from json data to json token"""
-    challenge = json.loads(data)
-    k = challenge['k']
-    nlist = challenge['list']
+def solve(nlist, k):
+    """Solving from list and k to token"""
     solution = []
-    shortest_distance = sys.maxsize
+    shortest_distance = None
 
-    for i_key, i_val in enumerate(nlist):
-        for j_key, j_val in enumerate(nlist):
-            if i_val + j_val == k:
-                current_distance = abs(i_key - j_key)
-                if current_distance < distance:
-                    solution = [i_key, j_key]
-                    shortest_distance = current_distance
-
-    payload = {"token": solution}
-    payload = json.dumps(payload)
-    return payload
+    # The closest partner of every index j is the last index before j that
+    # holds the complement. Of all pairs with the shortest distance, the one
+    # which appears first in the list wins.
+    last_index = {}
+    for j_key, j_val in enumerate(nlist):
+        i_key = last_index.get(k - j_val)
+        if i_key is not None:
+            current_distance = j_key - i_key
+            if shortest_distance is None or \
+                    current_distance < shortest_distance:
+                solution = [i_key, j_key]
+                shortest_distance = current_distance
+                if shortest_distance == 1:
+                    break
+        last_index[j_val] = j_key
+    return solution
@@ -0,0 +1,90 @@
+"""
+Decoding of challenges and encoding of solutions, shared by all solution
+files.
+
+A solution file declares the shape of its input in INPUT, and its solve()
+returns the bare token. The runner decodes every challenge once into that
+shape and encodes the token once into the JSON payload for the server:
+
+    text    The challenge text, not decoded. Solvers that only decode the
+            parts they need, or decode it piece by piece, use this shape.
+    float   The challenge text as float.
+    json    The decoded JSON document.
+    list    The "list" of a JSON object.
+    list_k  The "list" and "k" of a JSON object, as two arguments.
+
+A token that is already encoded, or only exists as pieces of JSON text, can
+be returned as RawJSON. Solution files without INPUT follow the old
+contract: solve() gets the challenge text and returns the whole payload.
+"""
+
+import json
+import time
+
+
+class RawJSON:
+    """A token given as pieces of JSON text, which are joined when sent"""
+
+    __slots__ = ("parts",)
+
+    def __init__(self, *parts):
+        self.parts = parts
+
+
+def decode_list(challenge_text):
+    """Decode the list of a JSON object"""
+    return (json.loads(challenge_text)['list'],)
+
+
+def decode_list_k(challenge_text):
+    """Decode the list and k of a JSON object"""
+    challenge = json.loads(challenge_text)
+    return challenge['list'], challenge['k']
+
+
+DECODERS = {
+    "text": lambda challenge_text: (challenge_text,),
+    "float": lambda challenge_text: (float(challenge_text),),
+    "json": lambda challenge_text: (json.loads(challenge_text),),
+    "list": decode_list,
+    "list_k": decode_list_k}
+
+
+def encode_token(token):
+    """Encode a token into the payload for the solution server"""
+    if isinstance(token, RawJSON):
+        return "".join(('{"token": ',) + token.parts + ('}',))
+    return json.dumps({"token": token})
+
+
+class Solver:
+    """ Runs the solve() of a solution file with the decoder of its input
+        shape and encodes the token.
+    """
+
+    def __init__(self, solvefile):
+        self.solve = solvefile.solve
+        self.shape = getattr(solvefile, "INPUT", None)
+        if self.shape is not None and self.shape not in DECODERS:
+            raise ValueError("Unknown input shape '" + str(self.shape)
+                             + "' in " + solvefile.__name__)
+        self.decode = DECODERS.get(self.shape, DECODERS["text"])
+
+    def __call__(self, challenge_text):
+        """ Solve a single challenge. Returns the payload and the durations
+            of the decode, solve and encode steps and the CPU time used by
+            all three, in nanoseconds.
+        """
+        cpu_start = time.thread_time_ns()
+        decode_start = time.perf_counter_ns()
+        arguments = self.decode(challenge_text)
+        solve_start = time.perf_counter_ns()
+        token = self.solve(*arguments)
+        encode_start = time.perf_counter_ns()
+        payload = token if self.shape is None else encode_token(token)
+        encode_end = time.perf_counter_ns()
+        return payload, {
+            'decode': solve_start - decode_start,
+            'solve': encode_start - solve_start,
+            'encode': encode_end - encode_start,
+            'solve_cpu': time.thread_time_ns() - cpu_start}
@@ -0,0 +1,108 @@
+"""
+Incremental decoding of large JSON challenges.
+
+Many challenges send one big flat array of numbers. Instead of decoding the
+whole document, iter_array_chunks() decodes the array piece by piece, so a
+solver can stop as soon as it has its answer, and never holds more than one
+piece of the array as Python objects. Every piece is still decoded by the
+json module, so the speed per item stays the same.
+
+Arrays of integers can also be parsed by NumPy straight into an int64
+array with decode_int64_array(), without any Python objects per item.
+
+Only flat arrays of numbers, booleans or null are supported, where neither
+"," nor "]" can appear inside an item. Anything else raises ValueError, so
+the caller can fall back to json.loads().
+"""
+
+import re
+import json
+import warnings
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+CHUNK_SIZE = 1 << 16
+STREAM_THRESHOLD = 1 << 20
+INT64_LIMIT = 2 ** 63 - 1
+
+
+def iter_array_chunks(text, key, chunk_size=CHUNK_SIZE):
+    """ Yield the items of the array stored under the given key of a JSON
+        object, as lists of the items found in about chunk_size characters.
+    """
+    match = re.search('"' + re.escape(key) + r'"\s*:\s*\[', text)
+    if match is None:
+        raise ValueError("No array '" + key + "' in the challenge")
+    position = match.end()
+    while True:
+        chunk = text[position:position + chunk_size]
+        end = chunk.find("]")
+        if end != -1:
+            yield json.loads("[" + chunk[:end] + "]")
+            return
+        cut = chunk.rfind(",")
+        if cut == -1:
+            if position + chunk_size >= len(text):
+                raise ValueError("Unterminated array '" + key + "'")
+            # A single item longer than the chunk
+            chunk_size *= 2
+            continue
+        yield json.loads("[" + chunk[:cut] + "]")
+        position += cut + 1
+
+
+def array_span(text, key):
+    """ Return the start and end index of the text between the brackets of
+        the flat array stored under the given key of a JSON object.
+    """
+    match = re.search('"' + re.escape(key) + r'"\s*:\s*\[', text)
+    if match is None:
+        raise ValueError("No array '" + key + "' in the challenge")
+    end = text.find("]", match.end())
+    if end == -1:
+        raise ValueError("Unterminated array '" + key + "'")
+    return match.end(), end
+
+
+def array_text(text, key):
+    """ Return the text between the brackets of the flat array stored under
+        the given key of a JSON object, without decoding it.
+    """
+    start, end = array_span(text, key)
+    return text[start:end]
+
+
+def decode_value(text, key):
+    """ Decode the value stored under the given key of a JSON object without
+        decoding the rest of the document.
+    """
+    match = re.search('"' + re.escape(key) + r'"\s*:\s*', text)
+    if match is None:
+        raise ValueError("No value '" + key + "' in the challenge")
+    value, _ = json.JSONDecoder().raw_decode(text, match.end())
+    return value
+
+
+def decode_int64_array(text, key):
+    """ Parse the flat array stored under the given key of a JSON object
+        into a NumPy int64 array. Raises ValueError if NumPy is not
+        installed or an item is no 64 bit integer.
+    """
+    if numpy is None:
+        raise ValueError("NumPy is not installed")
+    with warnings.catch_warnings():
+        # Unparsable data is only reported by a warning in older NumPy
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            values = numpy.fromstring(array_text(text, key),
+                                      dtype=numpy.int64, sep=",")
+        except DeprecationWarning as error:
+            raise ValueError(str(error)) from error
+    # Values out of range are clipped to the limits while parsing
+    if len(values) and (values.max() >= INT64_LIMIT
+                        or values.min() <= -INT64_LIMIT):
+        raise ValueError("Array '" + key + "' exceeds 64 bit integers")
+    return values
@@ -0,0 +1,112 @@
+"""
+Append-only corpus of recorded challenges.
+
+Every challenge has its own pair of files in the corpus directory:
+
+    chall<n>.corpus  The records, one after another. Each record is a header
+                     with the lengths of its three fields, followed by the
+                     zlib-compressed challenge body, solution and verdict
+                     text of the solution server.
+    chall<n>.index   One 8 byte offset per record into the corpus file.
+
+The index entry is only written after the record itself, so a record that
+was cut off by a crash is never visible to readers.
+"""
+
+import os
+import zlib
+import struct
+import threading
+
+RECORD_HEADER = struct.Struct("<III")
+INDEX_ENTRY = struct.Struct("<Q")
+
+
+def corpus_paths(directory, challenge_number):
+    """ Paths of the corpus and index file of a challenge.
+    """
+    base = os.path.join(directory, "chall" + str(challenge_number))
+    return base + ".corpus", base + ".index"
+
+
+class CorpusWriter:
+    """ Appends records to the corpus of a single challenge. Safe to use
+        from multiple threads.
+    """
+
+    def __init__(self, directory, challenge_number):
+        os.makedirs(directory, exist_ok=True)
+        corpus_path, index_path = corpus_paths(directory, challenge_number)
+        self._corpus = open(corpus_path, "ab")
+        self._index = open(index_path, "ab")
+        self._lock = threading.Lock()
+
+    def append(self, challenge_text, solution, verdict):
+        """ Append a challenge body together with the pushed solution and
+            the verdict text returned by the solution server.
+        """
+        fields = [zlib.compress(field.encode("utf-8"))
+                  for field in (challenge_text, solution, verdict)]
+        record = RECORD_HEADER.pack(*(len(field) for field in fields)) \
+            + b"".join(fields)
+        with self._lock:
+            offset = self._corpus.seek(0, os.SEEK_END)
+            self._corpus.write(record)
+            self._corpus.flush()
+            self._index.write(INDEX_ENTRY.pack(offset))
+            self._index.flush()
+
+    def close(self):
+        """ Close both files of the corpus.
+        """
+        with self._lock:
+            self._corpus.close()
+            self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class CorpusReader:
+    """ Random access to the records of a challenge corpus.
+
+        Records are returned as (challenge_text, solution, verdict) tuples.
+    """
+
+    def __init__(self, directory, challenge_number):
+        corpus_path, index_path = corpus_paths(directory, challenge_number)
+        with open(index_path, "rb") as index_file:
+            index = index_file.read()
+        # Ignore a partly written index entry at the end
+        index = index[:len(index) - len(index) % INDEX_ENTRY.size]
+        self._offsets = [offset for (offset,)
+                         in INDEX_ENTRY.iter_unpack(index)]
+        self._corpus = open(corpus_path, "rb")
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, position):
+        self._corpus.seek(self._offsets[position])
+        lengths = RECORD_HEADER.unpack(
+            self._corpus.read(RECORD_HEADER.size))
+        return tuple(zlib.decompress(self._corpus.read(length))
+                     .decode("utf-8") for length in lengths)
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self[position]
+
+    def close(self):
+        """ Close the corpus file.
+        """
+        self._corpus.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,302 @@
+"""
+Seeded input generators and reference checks for the coding challenges.
+
+For every challenge, GENERATORS holds a function generate(rng, size) which
+returns a challenge as (challenge_text, data): challenge_text is exactly what
+the challenge server sends, data is the decoded input. The meaning of size
+depends on the challenge, mostly it is the length of the list or text.
+Challenges which pick two or four items of the list raise a smaller size to
+that number of items.
+
+VALIDATORS holds a function validate(data, token) for every challenge. It
+checks a token against the decoded input. It does not use the solution files
+in challenges/, so the solvers can be checked against it.
+
+Challenge 18 is checked the way challenges/chall18.py reads it: the list
+contains two values which differ by at most k.
+"""
+
+import json
+import string
+from fractions import Fraction
+
+
+def _number_list(rng, size, spread=10):
+    return [rng.randrange(-spread * size, spread * size) for _ in range(size)]
+
+
+def _two_distinct(rng, size):
+    i = rng.randrange(size)
+    j = rng.randrange(size - 1)
+    if j >= i:
+        j += 1
+    return i, j
+
+
+def generate_chall1(rng, size):
+    text = "".join(rng.choices(string.ascii_letters + string.digits, k=size))
+    return text, text
+
+
+def generate_chall2(rng, size):
+    nlist = rng.sample(range(-10 * size, 10 * size), size)
+    data = {"k": rng.choice(nlist), "list": nlist}
+    return json.dumps(data), data
+
+
+def generate_chall3(rng, size):
+    data = {"k": rng.randint(1, size), "list": _number_list(rng, size)}
+    return json.dumps(data), data
+
+
+def generate_chall4(rng, size):
+    data = {"k": rng.randrange(2 * size), "list": _number_list(rng, size)}
+    return json.dumps(data), data
+
+
+def generate_chall5(rng, size):
+    # Division is only used where it is exact and products are kept small,
+    # so float and exact evaluation give the same result.
+    tokens = []
+    stack = []
+    while len(tokens) < size or len(stack) > 1:
+        if len(stack) < 2 or (len(tokens) < size and rng.random() < 0.5):
+            value = rng.randint(0, 99)
+            tokens.append(str(value))
+            stack.append(value)
+            continue
+        arg2 = stack.pop()
+        arg1 = stack.pop()
+        operator = rng.choice("+-*/")
+        if operator == "/" and (arg2 == 0 or arg1 % arg2 != 0):
+            operator = "+"
+        if operator == "*" and abs(arg1 * arg2) >= 2 ** 31:
+            operator = "-"
+        result = {
+            "+": lambda: arg1 + arg2,
+            "-": lambda: arg1 - arg2,
+            "*": lambda: arg1 * arg2,
+            "/": lambda: arg1 // arg2}[operator]()
+        tokens.append(operator)
+        stack.append(result)
+    text = " ".join(tokens)
+    return text, text
+
+
+def generate_chall6(rng, size):
+    number = rng.getrandbits(size)
+    return str(number), number
+
+
+def generate_chall7(rng, size):
+    size = max(size, 2)
+    nlist = _number_list(rng, size)
+    i, j = _two_distinct(rng, size)
+    data = {"k": nlist[i] + nlist[j], "list": nlist}
+    return json.dumps(data), data
+
+
+def generate_chall8(rng, size):
+    size = max(size, 4)
+    nlist = _number_list(rng, size)
+    indices = rng.sample(range(size), 4)
+    data = {"k": sum(nlist[i] for i in indices), "list": nlist}
+    return json.dumps(data), data
+
+
+def generate_chall9(rng, size):
+    return generate_chall7(rng, size)
+
+
+def generate_chall10(rng, size):
+    number = rng.uniform(-size, size)
+    return repr(number), number
+
+
+def generate_chall11(rng, size):
+    parts = []
+    depth = 0
+    for _ in range(size):
+        choice = rng.random()
+        if choice < 0.2:
+            parts.append("(")
+            depth += 1
+        elif choice < 0.4 and depth:
+            parts.append(")")
+            depth -= 1
+        else:
+            parts.append(rng.choice("0123456789+-*/ "))
+    parts.extend(")" * depth)
+    if rng.random() < 0.5:
+        # Break the formula with a stray bracket
+        parts.insert(rng.randrange(len(parts) + 1), rng.choice("()"))
+    text = "".join(parts)
+    return text, text
+
+
+def generate_chall15(rng, size):
+    letters = rng.choices(string.ascii_letters, k=size // 2)
+    if rng.random() < 0.5:
+        letters = letters + letters[::-1]
+    else:
+        letters = letters + rng.choices(string.ascii_letters, k=size // 2)
+    noise = " ,;'?!.:-_"
+    word = "".join(
+        letter + (rng.choice(noise) if rng.random() < 0.2 else "")
+        for letter in letters)
+    data = {"word": word}
+    return json.dumps(data), data
+
+
+def generate_chall16(rng, size):
+    data = {"list": [rng.randrange(2 * size) for _ in range(size)]}
+    return json.dumps(data), data
+
+
+def generate_chall17(rng, size):
+    size = max(size, 2)
+    nlist = rng.sample(range(-10 * size, 10 * size), size)
+    if rng.random() < 0.5:
+        i, j = _two_distinct(rng, size)
+        nlist[i] = nlist[j]
+    data = {"list": nlist}
+    return json.dumps(data), data
+
+
+def generate_chall18(rng, size):
+    size = max(size, 2)
+    k = rng.randint(1, 10)
+    # Values are spread far enough apart to be more than k away from each
+    # other, unless a near duplicate is planted.
+    nlist = [value * (2 * k + 2)
+             for value in rng.sample(range(-10 * size, 10 * size), size)]
+    if rng.random() < 0.5:
+        i, j = _two_distinct(rng, size)
+        nlist[i] = nlist[j] + rng.randint(-k, k)
+    data = {"k": k, "list": nlist}
+    return json.dumps(data), data
+
+
+def _is_pair(data, token, count):
+    nlist = data["list"]
+    return isinstance(token, list) and len(token) == count \
+        and all(isinstance(i, int) and 0 <= i < len(nlist) for i in token) \
+        and len(set(token)) == count \
+        and sum(nlist[i] for i in token) == data["k"]
+
+
+def _evaluate_postfix(text):
+    stack = []
+    for token in text.split():
+        if token in "+-*/":
+            arg2 = stack.pop()
+            arg1 = stack.pop()
+            stack.append({
+                "+": lambda: arg1 + arg2,
+                "-": lambda: arg1 - arg2,
+                "*": lambda: arg1 * arg2,
+                "/": lambda: arg1 / arg2}[token]())
+        else:
+            stack.append(Fraction(int(token)))
+    return int(stack.pop())
+
+
+def _valid_brackets(text):
+    depth = 0
+    for character in text:
+        if character == "(":
+            depth += 1
+        elif character == ")":
+            depth -= 1
+            if depth < 0:
+                return False
+    return depth == 0
+
+
+def _is_palindrome(word):
+    letters = [c.lower() for c in word if c in string.ascii_letters]
+    return letters == letters[::-1]
+
+
+def _longest_run(nlist):
+    values = set(nlist)
+    longest = 0
+    for value in values:
+        if value - 1 not in values:
+            end = value
+            while end in values:
+                end += 1
+            longest = max(longest, end - value)
+    return longest
+
+
+def _min_pair_distance(data):
+    last_seen = {}
+    best = None
+    for index, value in enumerate(data["list"]):
+        if data["k"] - value in last_seen:
+            distance = index - last_seen[data["k"] - value]
+            if best is None or distance < best:
+                best = distance
+        last_seen[value] = index
+    return best
+
+
+def _has_near_duplicate(data):
+    k = data["k"]
+    buckets = {}
+    for value in data["list"]:
+        bucket = value // (k + 1)
+        for neighbour in (bucket - 1, bucket, bucket + 1):
+            if neighbour in buckets and abs(buckets[neighbour] - value) <= k:
+                return True
+        buckets[bucket] = value
+    return False
+
+
+def _is_bool(token):
+    return isinstance(token, bool)
+
+
+GENERATORS = {
+    1: generate_chall1,
+    2: generate_chall2,
+    3: generate_chall3,
+    4: generate_chall4,
+    5: generate_chall5,
+    6: generate_chall6,
+    7: generate_chall7,
+    8: generate_chall8,
+    9: generate_chall9,
+    10: generate_chall10,
+    11: generate_chall11,
+    15: generate_chall15,
+    16: generate_chall16,
+    17: generate_chall17,
+    18: generate_chall18}
+
+VALIDATORS = {
+    1: lambda data, token: token == data,
+    2: lambda data, token: token == data["list"].index(data["k"]),
+    3: lambda data, token:
+        token == sorted(data["list"], reverse=True)[data["k"] - 1],
+    4: lambda data, token: token == (
+        data["list"][-(data["k"] % len(data["list"])):]
+        + data["list"][:-(data["k"] % len(data["list"]))]
+        if data["k"] % len(data["list"]) else data["list"]),
+    5: lambda data, token: token == _evaluate_postfix(data),
+    6: lambda data, token: token == format(data, "b"),
+    7: lambda data, token: _is_pair(data, token, 2),
+    8: lambda data, token: _is_pair(data, token, 4),
+    9: lambda data, token: _is_pair(data, token, 2)
+        and abs(token[0] - token[1]) == _min_pair_distance(data),
+    10: lambda data, token: token == data,
+    11: lambda data, token:
+        _is_bool(token) and token == _valid_brackets(data),
+    15: lambda data, token:
+        _is_bool(token) and token == _is_palindrome(data["word"]),
+    16: lambda data, token: token == _longest_run(data["list"]),
+    17: lambda data, token: _is_bool(token)
+        and token == (len(set(data["list"])) != len(data["list"])),
+    18: lambda data, token:
+        _is_bool(token) and token == _has_near_duplicate(data)}
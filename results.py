@@ -0,0 +1,267 @@
+#!/bin/python
+"""
+Append-only store of the results of solve.py --save-res, and a small query
+tool to compare the runs of a challenge over time.
+
+Every invocation of solve.py with --save-res is a session, named by the
+time it started in nanoseconds. The store directory holds:
+
+    <session>.results  The runs of a session, in blocks. Each block is a
+                       header with the number of runs and the length of the
+                       block, followed by zlib-compressed JSON lines, one
+                       per run: challenge, run id, phase durations in
+                       nanoseconds, verdict and CTF token.
+    results.index      One entry per block of all sessions, with the
+                       challenge, the position of the block and a summary
+                       of its runs.
+
+Runs are buffered per challenge and written as a block once BLOCK_RECORDS
+runs are buffered, so memory does not grow with the number of runs. Every
+block holds the runs of a single challenge, and the index entry is only
+written after the block itself, so a block cut off by a crash is never
+visible to readers. Summaries over all sessions are built from the index
+alone; only percentiles need the blocks of the selected challenges.
+
+    ./results.py 3 7 --last 5
+    ./results.py --percentiles
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import struct
+import argparse
+import threading
+import collections
+import stats
+
+DEFAULT_DIRECTORY = "results"
+BLOCK_RECORDS = 1024
+INDEX_READ_ENTRIES = 4096
+
+BLOCK_HEADER = struct.Struct("<II")
+INDEX_ENTRY = struct.Struct("<QIQIIIIQQQQ")
+
+IndexEntry = collections.namedtuple("IndexEntry", (
+    "session", "challenge", "offset", "length", "runs", "wrong",
+    "unverified", "total_sum", "total_min", "total_max", "solve_sum"))
+
+
+def results_path(directory, session):
+    """ Path of the results file of a session.
+    """
+    return os.path.join(directory, str(session) + ".results")
+
+
+def index_path(directory):
+    """ Path of the index of all sessions.
+    """
+    return os.path.join(directory, "results.index")
+
+
+class ResultsWriter:
+    """ Appends the runs of a single session to the store. Safe to use from
+        multiple threads.
+    """
+
+    def __init__(self, directory=DEFAULT_DIRECTORY):
+        os.makedirs(directory, exist_ok=True)
+        self.session = time.time_ns()
+        self._results = open(results_path(directory, self.session), "ab")
+        self._index = open(index_path(directory), "ab")
+        self._buffers = {}
+        self._runs = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def append(self, challenge_number, phases, verdict, token):
+        """ Add a finished run of a challenge with the durations of its
+            phases, as returned by stats.run_phases(), its verdict and the
+            CTF token returned for it.
+        """
+        with self._lock:
+            records = self._buffers.setdefault(challenge_number, [])
+            records.append({
+                "challenge": challenge_number,
+                "run": self._runs,
+                "phases": phases,
+                "verdict": verdict,
+                "token": token})
+            self._runs += 1
+            if len(records) < BLOCK_RECORDS:
+                return
+            del self._buffers[challenge_number]
+        # Compress outside of the lock, so other threads can keep adding runs
+        self._write_block(challenge_number, records)
+
+    def _write_block(self, challenge_number, records):
+        data = zlib.compress("".join(
+            json.dumps(record, separators=(",", ":")) + "\n"
+            for record in records).encode("utf-8"))
+        totals = [record["phases"]["total"] for record in records]
+        verdicts = collections.Counter(
+            record["verdict"] for record in records)
+        with self._write_lock:
+            offset = self._results.seek(0, os.SEEK_END)
+            self._results.write(BLOCK_HEADER.pack(len(records), len(data))
+                                + data)
+            self._results.flush()
+            self._index.write(INDEX_ENTRY.pack(
+                self.session, challenge_number, offset, len(data),
+                len(records), verdicts["wrong"], verdicts["unverified"],
+                sum(totals), min(totals), max(totals),
+                sum(record["phases"]["solve"] for record in records)))
+            self._index.flush()
+
+    def close(self):
+        """ Write all buffered runs and close both files.
+        """
+        with self._lock:
+            buffers, self._buffers = self._buffers, {}
+        for challenge_number, records in buffers.items():
+            self._write_block(challenge_number, records)
+        with self._write_lock:
+            self._results.close()
+            self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def iter_index(directory=DEFAULT_DIRECTORY):
+    """ Yield the entries of the index of the store, reading it in chunks.
+        A partly written entry at the end is ignored.
+    """
+    with open(index_path(directory), "rb") as index_file:
+        while True:
+            chunk = index_file.read(INDEX_ENTRY.size * INDEX_READ_ENTRIES)
+            chunk = chunk[:len(chunk) - len(chunk) % INDEX_ENTRY.size]
+            if not chunk:
+                return
+            for fields in INDEX_ENTRY.iter_unpack(chunk):
+                yield IndexEntry(*fields)
+
+
+def read_block(directory, entry):
+    """ Return the runs of the block of an index entry as dictionaries.
+    """
+    with open(results_path(directory, entry.session), "rb") as results_file:
+        results_file.seek(entry.offset)
+        _, length = BLOCK_HEADER.unpack(results_file.read(BLOCK_HEADER.size))
+        data = zlib.decompress(results_file.read(length))
+    return [json.loads(line) for line in data.decode("utf-8").splitlines()]
+
+
+def summarize(entries, challenge_numbers=None):
+    """ Aggregate index entries per challenge and session. Returns a
+        dictionary of challenges, each with a dictionary of sessions in
+        the order they started, each summarizing the runs of the session.
+    """
+    summaries = {}
+    for entry in entries:
+        if challenge_numbers and entry.challenge not in challenge_numbers:
+            continue
+        sessions = summaries.setdefault(entry.challenge, {})
+        summary = sessions.get(entry.session)
+        if summary is None:
+            summary = sessions[entry.session] = {
+                'runs': 0, 'wrong': 0, 'unverified': 0, 'total_sum': 0,
+                'total_min': entry.total_min, 'total_max': 0,
+                'solve_sum': 0, 'entries': []}
+        summary['runs'] += entry.runs
+        summary['wrong'] += entry.wrong
+        summary['unverified'] += entry.unverified
+        summary['total_sum'] += entry.total_sum
+        summary['total_min'] = min(summary['total_min'], entry.total_min)
+        summary['total_max'] = max(summary['total_max'], entry.total_max)
+        summary['solve_sum'] += entry.solve_sum
+        summary['entries'].append(entry)
+    return {challenge: dict(sorted(sessions.items()))
+            for challenge, sessions in sorted(summaries.items())}
+
+
+def session_percentiles(directory, summary):
+    """ Percentiles of the total and solve durations of the runs of a
+        session, in nanoseconds. Reads the blocks of the session.
+    """
+    run_statistics = stats.RunStatistics()
+    for entry in summary['entries']:
+        for record in read_block(directory, entry):
+            run_statistics.add_phases(record["phases"])
+    return {phase: {key: run_statistics.phases[phase].percentile(percent)
+                    for key, percent in (('p50', 50), ('p99', 99))}
+            for phase in ('total', 'solve')}
+
+
+def print_summaries(directory, summaries, settings):
+    """ Print a table per challenge with one line per session. The change
+        of the mean total duration is relative to the session before.
+    """
+    for challenge, sessions in summaries.items():
+        header = "{:<19} {:>8} {:>7} {:>11} {:>11} {:>11} {:>11} {:>8}".format(
+            "session", "runs", "wrong", "mean ms", "min ms", "max ms",
+            "solve ms", "change")
+        if settings.percentiles:
+            header += " {:>11} {:>11}".format("p50 ms", "p99 ms")
+        sys.stdout.write("chall" + str(challenge) + "\n" + header + "\n")
+        previous_mean = None
+        for position, (session, summary) in enumerate(sessions.items()):
+            mean = summary['total_sum'] / summary['runs']
+            change = "-" if previous_mean is None else \
+                "{:+.1f}%".format((mean / previous_mean - 1) * 100)
+            previous_mean = mean
+            if settings.last and position < len(sessions) - settings.last:
+                continue
+            line = "{:<19} {:>8} {:>7} {:>11.3f} {:>11.3f} {:>11.3f} " \
+                "{:>11.3f} {:>8}".format(
+                    time.strftime("%Y-%m-%d %H:%M:%S",
+                                  time.localtime(session / 1e9)),
+                    summary['runs'], summary['wrong'], mean / 1e6,
+                    summary['total_min'] / 1e6, summary['total_max'] / 1e6,
+                    summary['solve_sum'] / summary['runs'] / 1e6, change)
+            if settings.percentiles:
+                total = session_percentiles(directory, summary)['total']
+                line += " {:>11.3f} {:>11.3f}".format(
+                    total['p50'] / 1e6, total['p99'] / 1e6)
+            sys.stdout.write(line + "\n")
+        sys.stdout.write("\n")
+
+
+def parse_arguments(argv):
+    """ Parse the command line of the query tool.
+    """
+    parser = argparse.ArgumentParser(
+        description="Compare the saved results of solve.py --save-res.")
+    parser.add_argument("challenges", nargs="*", type=int,
+                        help="challenges to show (default: all)")
+    parser.add_argument("--dir", default=DEFAULT_DIRECTORY,
+                        help="directory of the results store (default: "
+                             + DEFAULT_DIRECTORY + ")")
+    parser.add_argument("--last", type=int, default=0, metavar="N",
+                        help="only show the last N sessions per challenge")
+    parser.add_argument("--percentiles", action="store_true",
+                        help="also show percentiles of the run time, which "
+                             "reads the saved runs instead of the index only")
+    return parser.parse_args(argv)
+
+
+def main():
+    settings = parse_arguments(sys.argv[1:])
+    if not os.path.isfile(index_path(settings.dir)):
+        sys.stderr.write("No saved results in " + settings.dir + ".\n")
+        return 1
+    summaries = summarize(iter_index(settings.dir), set(settings.challenges))
+    if not summaries:
+        sys.stderr.write("No saved results of these challenges.\n")
+        return 1
+    print_summaries(settings.dir, summaries, settings)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
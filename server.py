@@ -0,0 +1,209 @@
+#!/bin/python
+"""
+Local stand-in for the challenge server, for load tests without touching
+https://cc.the-morpheus.de.
+
+It serves generated inputs on /challenges/<n>/ and checks solutions pushed to
+/solutions/<n>/ with the reference checks in generators.py. Latency, jitter,
+wrong verdicts and 429 rate limiting can be injected to test how solve.py
+behaves under load:
+
+    ./server.py --port 8000 --latency 20 --jitter 5 --rate-limit 200
+    ./solve.py 7 1000 --parallel --url http://127.0.0.1:8000
+
+A pushed solution is accepted if it is a valid solution of one of the
+challenges of that number which were handed out but not solved yet. With
+yes/no challenges, a wrong answer can thereby still be matched to another
+pending challenge, so this only approximates the per-client state of the
+real server.
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import collections
+import http.server
+from generators import GENERATORS, VALIDATORS
+
+MAX_PENDING = 10000
+
+
+class TokenBucket:
+    """ Simple token bucket which allows rate requests per second with bursts
+        of up to rate requests.
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        """ Take a token. Returns False if the bucket is empty.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate,
+                              self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class ChallengeHandler(http.server.BaseHTTPRequestHandler):
+    """ Handles the challenge and solution endpoints.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.settings.verbose:
+            super().log_message(format, *args)
+
+    def send_text(self, text, status=200, headers=None):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def challenge_number(self, prefix):
+        """ Challenge number of the request path, or None if the path or the
+            number is unknown.
+        """
+        parts = self.path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] != prefix or not parts[1].isdigit():
+            return None
+        number = int(parts[1])
+        return number if number in GENERATORS else None
+
+    def admit(self):
+        """ Apply rate limit and latency. Returns False if the request was
+            rejected.
+        """
+        settings = self.server.settings
+        if self.server.bucket is not None and not self.server.bucket.take():
+            self.send_text("Error: Too Many Requests", 429,
+                           {"Retry-After": str(settings.retry_after)})
+            return False
+        delay = settings.latency + random.uniform(-settings.jitter,
+                                                  settings.jitter)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        return True
+
+    def do_GET(self):
+        number = self.challenge_number("challenges")
+        if number is None:
+            self.send_text("Error: Unknown challenge", 404)
+            return
+        if not self.admit():
+            return
+        with self.server.lock:
+            text, data = GENERATORS[number](self.server.rng,
+                                            self.server.settings.size)
+            self.server.pending[number].append(data)
+        self.send_text(text)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        number = self.challenge_number("solutions")
+        if number is None:
+            self.send_text("Error: Unknown challenge", 404)
+            return
+        if not self.admit():
+            return
+        try:
+            token = json.loads(body)["token"]
+        except (ValueError, KeyError, TypeError):
+            self.send_text("Error: Invalid JSON")
+            return
+        if random.random() < self.server.settings.error_rate:
+            self.send_text("Error: Injected error")
+            return
+
+        with self.server.lock:
+            pending = self.server.pending[number]
+            candidates = list(pending)
+        # Most solutions belong to one of the latest challenges
+        for data in reversed(candidates):
+            if VALIDATORS[number](data, token):
+                with self.server.lock:
+                    try:
+                        pending.remove(data)
+                    except ValueError:
+                        # Solved by another request in the meantime
+                        continue
+                self.send_text("Success: LOCAL-CTF-" + str(number))
+                return
+        self.send_text("Error: Wrong solution")
+
+
+def parse_arguments(argv):
+    """ Parse the command line of the server.
+    """
+    parser = argparse.ArgumentParser(
+        description="Local stand-in for the Morpheus challenge server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--size", type=int, default=100,
+                        help="size of the generated inputs (default: 100)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed of the input generators")
+    parser.add_argument("--latency", type=float, default=0,
+                        help="delay of every response in ms")
+    parser.add_argument("--jitter", type=float, default=0,
+                        help="random deviation of the delay in ms")
+    parser.add_argument("--error-rate", type=float, default=0,
+                        help="share of solutions answered with an error")
+    parser.add_argument("--rate-limit", type=float, default=0,
+                        help="requests per second before answering with 429 "
+                             "(default: unlimited)")
+    parser.add_argument("--retry-after", type=int, default=1,
+                        help="Retry-After of 429 responses in s")
+    parser.add_argument("--verbose", action="store_true",
+                        help="log every request")
+    settings = parser.parse_args(argv)
+    if settings.size < 1:
+        parser.error("the size must be at least 1")
+    return settings
+
+
+def main():
+    settings = parse_arguments(sys.argv[1:])
+    if hasattr(sys, "set_int_max_str_digits"):
+        # Challenge 6 works on integers with far more than 4300 digits
+        sys.set_int_max_str_digits(0)
+    server = http.server.ThreadingHTTPServer((settings.host, settings.port),
+                                             ChallengeHandler)
+    server.daemon_threads = True
+    server.settings = settings
+    server.rng = random.Random(settings.seed)
+    server.lock = threading.Lock()
+    server.pending = collections.defaultdict(
+        lambda: collections.deque(maxlen=MAX_PENDING))
+    server.bucket = TokenBucket(settings.rate_limit) \
+        if settings.rate_limit > 0 else None
+
+    sys.stdout.write("Serving challenges on http://" + settings.host + ":"
+                     + str(server.server_address[1]) + "\n")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
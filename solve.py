@@ -1,7 +1,9 @@
 #!/bin/python
 """
 This is the main function of the challengesolve python interface.
-It is called with 'solve.py <challengenumber> [number-of-runs]'.
+It is called with 'solve.py <challengenumber> [number-of-runs]', or with a
+set of challenges like 'solve.py 2,3,7-9 [number-of-runs]' or
+'solve.py all [number-of-runs]' to run several challenges in one batch.
 
 see 'solve.py --help' for fast information on how to use this script.
 
@@ -10,21 +12,42 @@ Exit Codes:
   101: Error while parsing arguments (in method parse_arguments() )
   102: Error while checking integrity of arguments
        (in method check_arguments() )
-  103: System error while creating threads
+  103: System error while creating worker threads
   104: No internet connection while trying to fetch challenges
        or push solutions.
   105: A solution file is invalid, the import failed, it doesnt provide a valid
        JSON to push to solution server or other error inside the solution file.
   106: Unknown Error.
+  107: The solver daemon could not be started or reached.
+  108: A file of the corpus or of the results store could not be read or
+       written.
 """
 
+import os
+import re
 import sys
+import json
 import time
-import _thread
+import queue
+import threading
+import tempfile
 import importlib
-import requests
+import corpus
+import stats
+import results
+from challenges import codec
+
+# requests, asyncio and concurrent.futures take most of the startup time.
+# They are imported by the functions that use them, so --help, --version and
+# the client of the solver daemon start without them.
 
 SCRIPT_VERSION = "1.0.0"
+DEFAULT_WORKERS = 16
+SERVER_URL = "https://cc.the-morpheus.de"
+ENGINES = ("sync", "async")
+DEFAULT_PREFETCH = 8
+DEFAULT_STAGE_WORKERS = [4, 1, 4]
+SOLVE_TARGETS = ("threads", "processes")
 
 
 def print_help():
@@ -35,24 +58,110 @@ def print_help():
     # Sorry for this mess, but it is very clean in terminal output.
     helpstr = "solve.py " + SCRIPT_VERSION + " - Python interface for the " \
               "Morpheus Coding Challenges\n\n" \
-              "Usage: solve.py <challenge> [runs] [flags...]\t" \
-              "Runs the solvescript\n       solve.py --help\t\t\t\tPrint " \
+              "Usage: solve.py <challenges> [runs] [flags...]\t" \
+              "Runs the solvescript\n\t\t\t\t\t\t<challenges> is a " \
+              "number, a set\n\t\t\t\t\t\tlike 2,3,7-9 or 'all'. " \
+              "Every\n\t\t\t\t\t\tchallenge is run [runs] times.\n" \
+              "       solve.py --help\t\t\t\tPrint " \
               "this help and exit\n       solve.py --version\t\t\tPrint " \
-              "version information and\n\t\t\t\t\t\texit\n\n" \
+              "version information and\n\t\t\t\t\t\texit\n" \
+              "       solve.py --daemon [--socket PATH]\tKeep a warm " \
+              "solver process\n\t\t\t\t\t\twith all solution files " \
+              "and\n\t\t\t\t\t\tHTTP connections, listening " \
+              "on\n\t\t\t\t\t\ta Unix socket\n" \
+              "       solve.py --client <challenges> [runs] [flags...]\n" \
+              "\t\t\t\t\t\tLet the daemon do the runs and\n" \
+              "\t\t\t\t\t\tprint its output\n\n" \
               "Possible flags:\n\t--bench\t\tPrint benchmark information\n" \
               "\t--interactive\tBefore solving the challenges, print the " \
               "parsed\n\t\t\truntime-settings and ask if user wants to " \
-              "proceed\n\t--parallel\tUse multithreading to solve every run " \
-              "in parallel.\n\t\t\tThis limits the maximum number of runs " \
-              "to 100 to \n\t\t\tprevent rate limit crashing.\n\t" \
-              "--save-res\tSave all results as JSON to a file. No filename\n" \
-              "\t\t\tis needed, as this script creates a new file with" \
-              "\n\t\t\tcurrent timestamp as name.\n"
+              "proceed\n\t--parallel\tUse a pool of worker threads to solve " \
+              "the runs in\n\t\t\tparallel.\n" \
+              "\t--workers N\tNumber of worker threads in parallel mode. " \
+              "This\n\t\t\tbounds the number of concurrent requests.\n" \
+              "\t\t\t(Default: " + str(DEFAULT_WORKERS) + ")\n" \
+              "\t--engine E\tHTTP engine to use, 'sync' or 'async'. The " \
+              "async\n\t\t\tengine runs all runs on one event loop " \
+              "with up to\n\t\t\t--workers requests in flight. " \
+              "(Default: sync)\n" \
+              "\t--pipeline\tRun fetching, solving and pushing as three " \
+              "stages\n\t\t\tconnected by bounded queues, so the next " \
+              "challenges\n\t\t\tare fetched while the current ones " \
+              "are solved.\n" \
+              "\t--prefetch K\tNumber of challenges and solutions that " \
+              "may wait\n\t\t\tin each queue of the pipeline. " \
+              "(Default: " + str(DEFAULT_PREFETCH) + ")\n" \
+              "\t--stage-workers F,S,P\n\t\t\tNumber of fetching, " \
+              "solving and pushing threads\n\t\t\tin the pipeline. " \
+              "(Default: " \
+              + ",".join(str(n) for n in DEFAULT_STAGE_WORKERS) + ", " \
+              "with one\n\t\t\tsolving thread per process when " \
+              "solving in\n\t\t\tprocesses)\n" \
+              "\t--solve-in T\tWhere to run the solver, 'threads' or " \
+              "'processes'.\n\t\t\tWith 'processes', the solver runs " \
+              "on a pool of\n\t\t\tprocesses while fetching and pushing " \
+              "stay on threads\n\t\t\tor the event loop. " \
+              "(Default: threads)\n" \
+              "\t--processes N\tNumber of solver processes. " \
+              "(Default: CPU count)\n" \
+              "\t--url URL\tBase URL of the challenge server, e.g. of a " \
+              "local\n\t\t\tserver.py. (Default: " + SERVER_URL + ")\n" \
+              "\t--record DIR\tStore every fetched challenge with the " \
+              "pushed\n\t\t\tsolution and the verdict of the server " \
+              "in a\n\t\t\tcorpus in DIR.\n" \
+              "\t--replay DIR\tSolve the challenges recorded in DIR " \
+              "without any\n\t\t\tnetwork access and check the solutions " \
+              "against\n\t\t\tthe recorded verdicts. Without [runs], " \
+              "every\n\t\t\trecorded challenge is solved once.\n\t" \
+              "--save-res\tSave every run with its timings, verdict and " \
+              "token\n\t\t\tto the results store in ./" \
+              + results.DEFAULT_DIRECTORY + ", as a new\n\t\t\tfile " \
+              "named by the current timestamp. Compare\n\t\t\tthe " \
+              "saved runs with ./results.py.\n" \
+              "\t--socket PATH\tUnix socket of the solver daemon.\n" \
+              "\t\t\t(Default: " + default_socket_path() + ")\n"
 
     sys.stdout.write(helpstr)
     return 0
 
 
+def private_socket_directory():
+    """ Return the directory of the default socket if $XDG_RUNTIME_DIR is
+        not set. The daemon creates it in the temporary directory, with
+        access for the current user only.
+    """
+    user = str(os.getuid()) if hasattr(os, "getuid") else "user"
+    return os.path.join(tempfile.gettempdir(), "solve.py-" + user)
+
+
+def default_socket_path():
+    """ Return the default Unix socket of the solver daemon. It lies in
+        $XDG_RUNTIME_DIR, or else in the private_socket_directory().
+    """
+    runtime_directory = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_directory:
+        return os.path.join(runtime_directory, "solve.py.sock")
+    return os.path.join(private_socket_directory(), "daemon.sock")
+
+
+def owned_by_user(path, mode_mask=0):
+    """ Helper function. Returns true if the given path exists, is no
+        symbolic link, belongs to the current user and has none of the
+        permission bits in mode_mask set.
+    """
+    import stat
+
+    try:
+        status = os.lstat(path)
+    except OSError:
+        return False
+    if stat.S_ISLNK(status.st_mode):
+        return False
+    if hasattr(os, "getuid") and status.st_uid != os.getuid():
+        return False
+    return not status.st_mode & mode_mask
+
+
 def print_version():
     """Print version information about this script"""
     sys.stdout.write(SCRIPT_VERSION + "\n")
@@ -70,6 +179,26 @@ def is_integer(n):
         return float(n).is_integer()
 
 
+def parse_challenge_set(text):
+    """ Helper function. Parses a set of challenges like '2,3,7-9' or 'all'
+        and returns the sorted challenge numbers, or None if the text is no
+        set of challenges.
+    """
+    if text == "all":
+        return solver_numbers()
+    numbers = set()
+    for part in text.split(","):
+        match = re.fullmatch(r"([0-9]+)(?:-([0-9]+))?", part)
+        if match is None:
+            return None
+        first = int(match.group(1))
+        last = int(match.group(2) or first)
+        if last < first:
+            return None
+        numbers.update(range(first, last + 1))
+    return sorted(numbers)
+
+
 def prompt_yes_no(question, default=None):
     """ Helper function. Prompts the user a yes/no question and returns
         True or false depending on the input
@@ -103,23 +232,34 @@ def prompt_yes_no(question, default=None):
                 + "(Or with yes/no)\n")
 
 
-def parse_arguments():
+def parse_arguments(arguments=None):
     """ Parses given arguments from a stack and returns a
-        dictionary with given settings
+        dictionary with given settings. Without arguments, the command line
+        arguments are parsed.
     """
+    if arguments is None:
+        arguments = sys.argv[1:]
     run_args = {
-        'raw_arguments': sys.argv[1:],
+        'raw_arguments': list(arguments),
         'parallel_mode': False,
+        'engine': "sync",
+        'pipeline_mode': False,
+        'solve_in': "threads",
+        'server_url': SERVER_URL,
         'run_interactive': False,
         'interactive_mode': False,
         'benchmark_mode': False,
-        'save_raw_results': False}
+        'save_raw_results': False,
+        'daemon_mode': False,
+        'client_mode': False,
+        'keep_alive': False}
 
     challenge_defined = False
     runs_defined = False
 
-    arg_stack = sys.argv[1:]
+    arg_stack = list(arguments)
     arg_errored = False
+    i = -1
 
     def print_unknown_argument():
         sys.stderr.write(
@@ -146,10 +286,27 @@ def parse_arguments():
             + str(i + 1) + ": This must be the first argument.\n")
         arg_errored = True
 
-    for i in range(len(arg_stack)):
+    def pop_option_value():
+        """ Take the value of an option like '--workers N' from the stack.
+            Returns None if the stack is already empty.
+        """
+        nonlocal i
+        if not arg_stack:
+            return None
+        i += 1
+        return arg_stack.pop(0)
+
+    while arg_stack:
+        i += 1
         argument_instance = arg_stack.pop(0)
         if is_integer(argument_instance) and not challenge_defined:
-            run_args['challenge_number'] = int(argument_instance)
+            run_args['challenge_numbers'] = [int(argument_instance)]
+            challenge_defined = True
+            continue
+        elif not challenge_defined and \
+                parse_challenge_set(argument_instance) is not None:
+            run_args['challenge_numbers'] = \
+                parse_challenge_set(argument_instance)
             challenge_defined = True
             continue
         elif is_integer(argument_instance) and not runs_defined:
@@ -178,6 +335,90 @@ def parse_arguments():
                 print_double_argument()
             run_args['parallel_mode'] = True
             continue
+        elif argument_instance == "--workers":
+            if "workers_number" in run_args:
+                print_double_argument()
+            value = pop_option_value()
+            if value is None or not is_integer(value):
+                print_illegal_argument()
+                arg_errored = True
+                continue
+            run_args['workers_number'] = int(value)
+            continue
+        elif argument_instance == "--engine":
+            value = pop_option_value()
+            if value not in ENGINES:
+                print_illegal_argument()
+                arg_errored = True
+                continue
+            run_args['engine'] = value
+            continue
+        elif argument_instance == "--pipeline":
+            if run_args['pipeline_mode']:
+                print_double_argument()
+            run_args['pipeline_mode'] = True
+            continue
+        elif argument_instance == "--prefetch":
+            if "prefetch_number" in run_args:
+                print_double_argument()
+            value = pop_option_value()
+            if value is None or not is_integer(value):
+                print_illegal_argument()
+                arg_errored = True
+                continue
+            run_args['prefetch_number'] = int(value)
+            continue
+        elif argument_instance == "--stage-workers":
+            if "stage_workers" in run_args:
+                print_double_argument()
+            value = pop_option_value()
+            values = value.split(",") if value is not None else []
+            if len(values) != 3 or not all(is_integer(n) for n in values):
+                print_illegal_argument()
+                arg_errored = True
+                continue
+            run_args['stage_workers'] = [int(n) for n in values]
+            continue
+        elif argument_instance == "--solve-in":
+            value = pop_option_value()
+            if value not in SOLVE_TARGETS:
+                print_illegal_argument()
+                arg_errored = True
+                continue
+            run_args['solve_in'] = value
+            continue
+        elif argument_instance == "--processes":
+            if "processes_number" in run_args:
+                print_double_argument()
+            value = pop_option_value()
+            if value is None or not is_integer(value):
+                print_illegal_argument()
+                arg_errored = True
+                continue
+            run_args['processes_number'] = int(value)
+            continue
+        elif argument_instance == "--url":
+            if run_args['server_url'] != SERVER_URL:
+                print_double_argument()
+            value = pop_option_value()
+            if value is None or not value.startswith(("http://",
+                                                      "https://")):
+                print_illegal_argument()
+                arg_errored = True
+                continue
+            run_args['server_url'] = value.rstrip("/")
+            continue
+        elif argument_instance in ("--record", "--replay"):
+            key = argument_instance[2:] + "_dir"
+            if key in run_args:
+                print_double_argument()
+            value = pop_option_value()
+            if value is None:
+                print_illegal_argument()
+                arg_errored = True
+                continue
+            run_args[key] = value
+            continue
         elif argument_instance == "--interactive":
             if run_args['interactive_mode']:
                 print_double_argument()
@@ -193,6 +434,23 @@ def parse_arguments():
                 print_double_argument()
             run_args['save_raw_results'] = True
             continue
+        elif argument_instance in ("--daemon", "--client"):
+            if i != 0:
+                print_illegal_argument()
+                arg_errored = True
+                continue
+            run_args[argument_instance[2:] + "_mode"] = True
+            continue
+        elif argument_instance == "--socket":
+            if "socket_path" in run_args:
+                print_double_argument()
+            value = pop_option_value()
+            if value is None:
+                print_illegal_argument()
+                arg_errored = True
+                continue
+            run_args['socket_path'] = value
+            continue
         else:
             print_unknown_argument()
             arg_errored = True
@@ -216,14 +474,70 @@ def check_arguments(run_args):
         sys.stderr.write("Warning checking arguments: " + custom_message
                          + " (Proceeding...)\n")
 
-    if "challenge_number" not in run_args:
+    if run_args['daemon_mode'] or run_args['client_mode']:
+        if "socket_path" not in run_args:
+            run_args['socket_path'] = default_socket_path()
+    elif "socket_path" in run_args:
+        print_warning_state("The socket only applies to the daemon and its "
+                            + "client. Ignoring it.")
+
+    if run_args['daemon_mode']:
+        if len(run_args['raw_arguments']) != \
+                1 + 2 * run_args['raw_arguments'].count("--socket"):
+            print_illegal_state("The daemon takes no other arguments than "
+                                + "--socket.")
+            sys.exit(102)
+        return
+
+    if run_args['interactive_mode'] and (run_args['client_mode']
+                                         or run_args['keep_alive']):
+        print_illegal_state("Interactive mode can not be used with the "
+                            + "daemon.")
+        sys.exit(102)
+
+    if run_args['client_mode']:
+        # Everything else is checked by the daemon
+        return
+
+    if not run_args.get('challenge_numbers'):
         print_illegal_state("No challenge number defined.")
         checking_errored = True
 
+    if "record_dir" in run_args and "replay_dir" in run_args:
+        print_illegal_state("Recording and replaying can not be combined.")
+        checking_errored = True
+
+    if "replay_dir" in run_args and (run_args['parallel_mode']
+                                     or run_args['pipeline_mode']
+                                     or run_args['engine'] == "async"):
+        print_illegal_state("Replay mode does not use the network and can "
+                            + "not be combined with parallel mode, pipeline "
+                            + "mode or the async engine.")
+        checking_errored = True
+
+    # Number of runs of every challenge. Without [runs], a replay solves
+    # every recorded challenge once.
+    run_args['challenge_runs'] = {}
+    for challenge_number in run_args.get('challenge_numbers', []):
+        runs = run_args.get('runs_number', 1)
+        if "replay_dir" in run_args:
+            corpus_path, index_path = corpus.corpus_paths(
+                run_args['replay_dir'], challenge_number)
+            if not os.path.isfile(corpus_path) or \
+                    not os.path.isfile(index_path) or \
+                    os.path.getsize(index_path) < corpus.INDEX_ENTRY.size:
+                print_illegal_state("There are no recorded challenges of "
+                                    + "challenge " + str(challenge_number)
+                                    + " in " + run_args['replay_dir'] + ".")
+                checking_errored = True
+            elif "runs_number" not in run_args:
+                runs = os.path.getsize(index_path) // corpus.INDEX_ENTRY.size
+        run_args['challenge_runs'][challenge_number] = runs
+
     if "runs_number" not in run_args:
         run_args['runs_number'] = 1
 
-    if "challenge_number" in run_args and run_args['challenge_number'] < 1:
+    if min(run_args.get('challenge_numbers') or [1]) < 1:
         print_illegal_state("The Challenge ID must not be 0 or negative.")
         checking_errored = True
 
@@ -231,18 +545,72 @@ def check_arguments(run_args):
         print_illegal_state("The number of runs can not be 0 or negative.")
         checking_errored = True
 
-    if "runs_number" in run_args and run_args['runs_number'] == 1 and \
+    if sum(run_args['challenge_runs'].values()) == 1 and \
             run_args['benchmark_mode']:
         print_warning_state("Benchmarking only makes sense with more than 1 "
                             + "run. Turning off benchmark mode.")
         run_args['benchmark_mode'] = False
 
-    if "runs_number" in run_args and run_args['runs_number'] > 100 and \
-            run_args['parallel_mode']:
-        print_warning_state("Parallel mode limits the maximum amount "
-                            + "of runs to 100 to prevent rate limit crashing. "
-                            + "Applying limit.")
-        run_args['runs_number'] = 100
+    if "workers_number" in run_args and run_args['workers_number'] < 1:
+        print_illegal_state("The number of workers can not be 0 or negative.")
+        checking_errored = True
+
+    if "workers_number" in run_args and not run_args['parallel_mode'] and \
+            run_args['engine'] != "async":
+        print_warning_state("The number of workers only applies to parallel "
+                            + "mode and the async engine. Ignoring it.")
+
+    if "workers_number" not in run_args:
+        run_args['workers_number'] = DEFAULT_WORKERS
+
+    if run_args['pipeline_mode'] and (run_args['parallel_mode']
+                                      or run_args['engine'] == "async"):
+        print_illegal_state("Pipeline mode can not be combined with parallel "
+                            + "mode or the async engine.")
+        checking_errored = True
+
+    if "prefetch_number" in run_args and run_args['prefetch_number'] < 1:
+        print_illegal_state("The prefetch depth can not be 0 or negative.")
+        checking_errored = True
+
+    if "stage_workers" in run_args and min(run_args['stage_workers']) < 1:
+        print_illegal_state("Every pipeline stage needs at least one thread.")
+        checking_errored = True
+
+    if ("prefetch_number" in run_args or "stage_workers" in run_args) and \
+            not run_args['pipeline_mode']:
+        print_warning_state("The prefetch depth and stage threads only apply "
+                            + "to pipeline mode. Ignoring them.")
+
+    if "prefetch_number" not in run_args:
+        run_args['prefetch_number'] = DEFAULT_PREFETCH
+
+    if "processes_number" in run_args and run_args['processes_number'] < 1:
+        print_illegal_state("The number of processes can not be 0 or "
+                            + "negative.")
+        checking_errored = True
+
+    if "processes_number" in run_args and \
+            run_args['solve_in'] != "processes":
+        print_warning_state("The number of processes only applies when "
+                            + "solving in processes. Ignoring it.")
+
+    if "processes_number" not in run_args:
+        run_args['processes_number'] = os.cpu_count() or 1
+
+    if run_args['solve_in'] == "processes" and not (
+            run_args['parallel_mode'] or run_args['pipeline_mode']
+            or run_args['engine'] == "async"):
+        print_warning_state("Without parallel mode, pipeline mode or the "
+                            + "async engine, only one solver process is busy "
+                            + "at a time.")
+
+    if "stage_workers" not in run_args:
+        run_args['stage_workers'] = list(DEFAULT_STAGE_WORKERS)
+        if run_args['solve_in'] == "processes":
+            # Every solving thread waits for one process, so there is one
+            # thread per process
+            run_args['stage_workers'][1] = run_args['processes_number']
 
     if checking_errored:
         sys.exit(102)
@@ -256,11 +624,31 @@ def interactive_pass(run_args):
         return
 
     setstr = "--------------------"
-    setstr += "\nChallenge to run: {}".format(run_args['challenge_number'])
-    setstr += "\nNumber of runs: {}".format(run_args['runs_number'])
+    setstr += "\nChallenges to run: {}".format(
+        ", ".join(str(n) for n in run_args['challenge_numbers']))
+    setstr += "\nNumber of runs per challenge: {}".format(
+        ", ".join(str(n) for n in run_args['challenge_runs'].values()))
+    setstr += "\nServer: {}".format(run_args['server_url'])
     setstr += "\nParallel Mode: {}".format(run_args['parallel_mode'])
+    setstr += "\nHTTP engine: {}".format(run_args['engine'])
+    if run_args['parallel_mode'] or run_args['engine'] == "async":
+        setstr += "\nWorker threads: {}".format(run_args['workers_number'])
+    setstr += "\nPipeline Mode: {}".format(run_args['pipeline_mode'])
+    if run_args['pipeline_mode']:
+        setstr += "\nPrefetch depth: {}".format(run_args['prefetch_number'])
+        setstr += "\nStage threads (fetch, solve, push): {}".format(
+            ", ".join(str(n) for n in run_args['stage_workers']))
+    setstr += "\nSolve in: {}".format(run_args['solve_in'])
+    if run_args['solve_in'] == "processes":
+        setstr += "\nSolver processes: {}".format(
+            run_args['processes_number'])
+    if "record_dir" in run_args:
+        setstr += "\nRecord to: {}".format(run_args['record_dir'])
+    if "replay_dir" in run_args:
+        setstr += "\nReplay from: {}".format(run_args['replay_dir'])
     setstr += "\nBenchmark Mode: {}".format(run_args['benchmark_mode'])
-    setstr += "\nSave results in file: {}".format(run_args['save_raw_results'])
+    setstr += "\nSave results to {}: {}".format(
+        results.DEFAULT_DIRECTORY, run_args['save_raw_results'])
     setstr += "\n--------------------"
     sys.stdout.write(setstr + "\n\n")
 
@@ -268,202 +656,1131 @@ def interactive_pass(run_args):
         sys.exit(0)
 
 
-def solve_instance(run_args, run_data, timing_data, i, solvefile):
-    run_data['runs_in_progress'] += 1
-    run_data['runs_awaiting'] -= 1
+def init_solve_process(challenge_numbers):
+    """ Initializer of the solver processes. Imports the solution files of
+        the batch once, so every call only has to ship the challenge text.
+    """
+    for challenge_number in challenge_numbers:
+        load_solver(challenge_number)
 
-    timing_instance = {
-        'total_start': time.time()}
 
-    challenge = requests.get(
-        "https://cc.the-morpheus.de/challenges/"
-        + str(run_args['challenge_number']) + "/")
+def solve_in_process(challenge_number, challenge_text):
+    """ Solve a single challenge inside a solver process. Returns the
+        solution and the durations of its phases.
+    """
+    return load_solver(challenge_number)(challenge_text)
 
-    timing_instance['runtime_start'] = time.time()
-    solution_instance = solvefile.solve(challenge.text)
-    timing_instance['runtime_end'] = time.time()
 
-    solution_result = requests.post(
-        "https://cc.the-morpheus.de/solutions/"
-        + str(run_args['challenge_number']) + "/",
-        solution_instance)
+def solve_on_pool(process_pool, challenge_number, challenge_text):
+    """ Solve a single challenge on the process pool and wait for the
+        solution.
+    """
+    return process_pool.submit(
+        solve_in_process, challenge_number, challenge_text).result()
+
+
+def start_process_pool(run_args, challenge_numbers):
+    """ Start the solver processes and wait until every one of them has
+        imported the solution files, so process startup is not part of the
+        measured runs.
+    """
+    import concurrent.futures
+
+    executor = concurrent.futures.ProcessPoolExecutor(
+        run_args['processes_number'],
+        initializer=init_solve_process,
+        initargs=(challenge_numbers,))
+    warmup = [executor.submit(time.sleep, 0.01)
+              for _ in range(run_args['processes_number'])]
+    concurrent.futures.wait(warmup)
+    return executor
+
+
+def new_run_data():
+    """ Create an empty set of run counters and statistics. Every worker
+        thread owns one of these, so they can be updated without locking.
+    """
+    return {
+        'runs_finished': 0,
+        'wrong_solutions': 0,
+        'unverified_solutions': 0,
+        'ctf_token': None,
+        'statistics': stats.RunStatistics()}
+
+
+def merge_run_data(run_data, worker_data):
+    """ Merge the counters of a single worker into the given run counters.
+    """
+    run_data['runs_finished'] += worker_data['runs_finished']
+    run_data['wrong_solutions'] += worker_data['wrong_solutions']
+    run_data['unverified_solutions'] += worker_data['unverified_solutions']
+    if run_data['ctf_token'] is None:
+        run_data['ctf_token'] = worker_data['ctf_token']
+    run_data['statistics'].merge(worker_data['statistics'])
+
+
+def worker_run_data(worker_data, challenge):
+    """ Return the counters of a worker for the given challenge. A worker
+        keeps one set of counters per challenge it ran.
+    """
+    run_data = worker_data.get(challenge['number'])
+    if run_data is None:
+        run_data = worker_data[challenge['number']] = new_run_data()
+    return run_data
+
+
+def merge_worker_data(batch, worker_data):
+    """ Merge the counters of a single worker into the counters of the
+        challenges of the batch.
+    """
+    for challenge_number, run_data in worker_data.items():
+        merge_run_data(batch[challenge_number]['run_data'], run_data)
+
+
+def iter_runs(batch):
+    """ Yield the challenge of every run of the batch. The runs of a
+        challenge are handed out one after the other.
+    """
+    for challenge in batch.values():
+        for _ in range(challenge['runs']):
+            yield challenge
+
+
+def challenge_path(challenge):
+    """ Path of the challenge on the server, relative to the server URL.
+    """
+    return "/challenges/" + str(challenge['number']) + "/"
+
+
+def solution_path(challenge):
+    """ Path to push the solution to, relative to the server URL.
+    """
+    return "/solutions/" + str(challenge['number']) + "/"
+
+
+class StorageError(Exception):
+    """ Raised when the corpus or the results store can not be read or
+        written, so a local file error is not reported as a network error.
+    """
 
-    if "Error" in solution_result.text:
+    def __init__(self, store, err):
+        super().__init__("Could not access " + store + ": " + str(err))
+
+
+def count_verdict(run_data, result_text):
+    """ Count the verdict of the solution server for a single run. Returns
+        the verdict, 'right' or 'wrong', and the CTF token of a right
+        solution.
+    """
+    verdict = "wrong"
+    ctf_token = None
+    if "Error" in result_text:
         run_data['wrong_solutions'] += 1
     else:
+        verdict = "right"
+        ctf_token = result_text.strip("Success, ").strip(": ")
         if run_data['ctf_token'] is None:
-            ctf_token = solution_result.text.strip("Success, ").strip(": ")
             run_data['ctf_token'] = ctf_token
 
-    timing_instance['total_end'] = time.time()
+    run_data['runs_finished'] += 1
+    return verdict, ctf_token
 
-    t_key = "c" + str(run_args['challenge_number']) + "r" + str(i)
-    timing_data[t_key] = timing_instance
 
-    run_data['runs_finished'] += 1
-    run_data['runs_in_progress'] -= 1
+def register_solution(challenge, run_data, challenge_text, solution_instance,
+                      result_text):
+    """ Count the verdict of the solution server for a single run and add
+        the run to the corpus of the challenge if recording is enabled.
+        Returns the verdict and CTF token, see count_verdict().
+    """
+    verdict = count_verdict(run_data, result_text)
+    if challenge['corpus_writer'] is not None:
+        try:
+            challenge['corpus_writer'].append(
+                challenge_text, solution_instance, result_text)
+        except OSError as err:
+            raise StorageError("the corpus", err) from err
+    return verdict
+
+
+def finish_run(challenge, run_data, timing_instance, verdict):
+    """ Count the phases of a finished run and save the run to the results
+        store if saving is enabled. verdict is the verdict and CTF token
+        returned by count_verdict().
+    """
+    phases = stats.run_phases(timing_instance)
+    run_data['statistics'].add_phases(phases)
+    if challenge['results_writer'] is not None:
+        try:
+            challenge['results_writer'].append(challenge['number'], phases,
+                                               *verdict)
+        except OSError as err:
+            raise StorageError("the results store in "
+                               + results.DEFAULT_DIRECTORY, err) from err
+
+
+def same_solution(solution, other):
+    """ Compare two solutions. JSON solutions are compared by value, so
+        differences in formatting do not matter.
+    """
+    try:
+        return json.loads(solution) == json.loads(other)
+    except ValueError:
+        return solution == other
+
+
+def create_session(server_url, pool_size):
+    """ Create a HTTP session which keeps up to pool_size connections to the
+        challenge server alive. Requests rejected with 429 Too Many Requests
+        are retried after the delay the server asks for.
+    """
+    import requests
+    import requests.adapters
+    import urllib3.util
+    import asynchttp
+
+    # urllib3 1.26 renamed method_whitelist to allowed_methods, and 2.0
+    # dropped the old name. None retries every method, POST included.
+    if hasattr(urllib3.util.Retry, "DEFAULT_ALLOWED_METHODS"):
+        methods = {'allowed_methods': None}
+    else:
+        methods = {'method_whitelist': None}
+
+    session = requests.Session()
+    retries = urllib3.util.Retry(
+        total=asynchttp.MAX_RETRIES,
+        connect=0,
+        read=0,
+        status_forcelist=[429],
+        backoff_factor=asynchttp.RETRY_DELAY,
+        **methods)
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=pool_size,
+        max_retries=retries)
+    session.mount(server_url, adapter)
+    return session
+
+
+def solve_instance(run_args, challenge, run_data, session):
+    """ Fetch, solve and push a single run of the challenge. The results are
+        counted in the given run data.
+    """
+    timing_instance = {
+        'total_start': time.perf_counter_ns()}
+
+    response = session.get(run_args['server_url'] + challenge_path(challenge))
+    timing_instance['fetch_end'] = time.perf_counter_ns()
+
+    solution_instance, phase_times = challenge['solve'](response.text)
+    timing_instance.update(phase_times)
+
+    timing_instance['post_start'] = time.perf_counter_ns()
+    solution_result = session.post(
+        run_args['server_url'] + solution_path(challenge),
+        solution_instance)
+
+    verdict = register_solution(challenge, run_data, response.text,
+                                solution_instance, solution_result.text)
+
+    timing_instance['total_end'] = time.perf_counter_ns()
+    finish_run(challenge, run_data, timing_instance, verdict)
 
     return
 
 
-def solve_challenges(run_args):
-    """ Take the argument dictionary and run the challenges
-        with the given settings.
+def solve_parallel(run_args, batch, session):
+    """ Solve all runs of the batch on a bounded pool of worker threads.
+
+        Every worker pulls the next run from a shared iterator until all
+        runs are handed out, and collects its results in its own counters.
+        The main thread blocks until all workers are done and merges their
+        counters afterwards. If a worker fails, the others stop after their
+        current run.
     """
-    run_data = {
-        'runs_awaiting': run_args['runs_number'],
-        'runs_in_progress': 0,
-        'runs_finished': 0,
-        'wrong_solutions': 0,
-        'ctf_token': None}
+    import concurrent.futures
+
+    runs = iter_runs(batch)
+    runs_lock = threading.Lock()
+    aborted = threading.Event()
+
+    def worker():
+        worker_data = {}
+        try:
+            while not aborted.is_set():
+                with runs_lock:
+                    challenge = next(runs, None)
+                if challenge is None:
+                    break
+                solve_instance(run_args, challenge,
+                               worker_run_data(worker_data, challenge),
+                               session)
+        except BaseException:
+            aborted.set()
+            raise
+        return worker_data
+
+    workers = min(run_args['workers_number'],
+                  sum(challenge['runs'] for challenge in batch.values()))
+    with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+        try:
+            futures = [executor.submit(worker) for _ in range(workers)]
+        except RuntimeError as err:
+            aborted.set()
+            sys.stderr.write("Error while creating worker threads: "
+                             + str(err) + "\n")
+            sys.exit(103)
+        for future in concurrent.futures.as_completed(futures):
+            merge_worker_data(batch, future.result())
+
+
+def solve_pipelined(run_args, batch, session):
+    """ Solve all runs of the batch in a pipeline of three stages:
+        fetching, solving and pushing. The stages are connected by bounded
+        queues, so up to --prefetch challenges are fetched ahead while
+        others are solved, and solutions wait for a free pushing thread
+        without blocking the solver.
+
+        Returns the sampled depth of both queues.
+    """
+    import concurrent.futures
+
+    fetchers, solvers, pushers = run_args['stage_workers']
+    solve_queue = queue.Queue(run_args['prefetch_number'])
+    push_queue = queue.Queue(run_args['prefetch_number'])
+    queue_data = {
+        'solve_queue': {'samples': 0, 'depth_sum': 0, 'max_depth': 0},
+        'push_queue': {'samples': 0, 'depth_sum': 0, 'max_depth': 0}}
+
+    runs = iter_runs(batch)
+    state_lock = threading.Lock()
+    aborted = threading.Event()
+    # Number of threads still running per stage. The last thread of a stage
+    # sends one end marker per thread of the next stage.
+    running = {'fetch': fetchers, 'solve': solvers}
+
+    def put(target, item, stats=None):
+        while not aborted.is_set():
+            try:
+                target.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            if stats is not None:
+                depth = target.qsize()
+                with state_lock:
+                    stats['samples'] += 1
+                    stats['depth_sum'] += depth
+                    stats['max_depth'] = max(stats['max_depth'], depth)
+            return
+
+    def get(source):
+        while not aborted.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+    def finish_stage(stage, target, markers):
+        with state_lock:
+            running[stage] -= 1
+            last = running[stage] == 0
+        if last:
+            for _ in range(markers):
+                put(target, None)
+
+    def fetcher():
+        try:
+            while not aborted.is_set():
+                with state_lock:
+                    challenge = next(runs, None)
+                if challenge is None:
+                    break
+                timing_instance = {
+                    'total_start': time.perf_counter_ns()}
+                response = session.get(
+                    run_args['server_url'] + challenge_path(challenge))
+                timing_instance['fetch_end'] = time.perf_counter_ns()
+                put(solve_queue, (challenge, timing_instance, response.text),
+                    queue_data['solve_queue'])
+        except BaseException:
+            aborted.set()
+            raise
+        finally:
+            finish_stage('fetch', solve_queue, solvers)
+
+    def solver():
+        try:
+            while True:
+                item = get(solve_queue)
+                if item is None:
+                    break
+                challenge, timing_instance, challenge_text = item
+                solution_instance, phase_times = \
+                    challenge['solve'](challenge_text)
+                timing_instance.update(phase_times)
+                put(push_queue, (challenge, timing_instance, challenge_text,
+                                 solution_instance),
+                    queue_data['push_queue'])
+        except BaseException:
+            aborted.set()
+            raise
+        finally:
+            finish_stage('solve', push_queue, pushers)
+
+    def pusher():
+        worker_data = {}
+        try:
+            while True:
+                item = get(push_queue)
+                if item is None:
+                    break
+                challenge, timing_instance, challenge_text, \
+                    solution_instance = item
+                run_data = worker_run_data(worker_data, challenge)
+                timing_instance['post_start'] = time.perf_counter_ns()
+                solution_result = session.post(
+                    run_args['server_url'] + solution_path(challenge),
+                    solution_instance)
+                verdict = register_solution(
+                    challenge, run_data, challenge_text, solution_instance,
+                    solution_result.text)
+                timing_instance['total_end'] = time.perf_counter_ns()
+                finish_run(challenge, run_data, timing_instance, verdict)
+        except BaseException:
+            aborted.set()
+            raise
+        return worker_data
+
+    with concurrent.futures.ThreadPoolExecutor(
+            fetchers + solvers + pushers) as executor:
+        try:
+            futures = [executor.submit(fetcher) for _ in range(fetchers)]
+            futures += [executor.submit(solver) for _ in range(solvers)]
+            push_futures = [executor.submit(pusher) for _ in range(pushers)]
+        except RuntimeError as err:
+            aborted.set()
+            sys.stderr.write("Error while creating worker threads: "
+                             + str(err) + "\n")
+            sys.exit(103)
+        for future in futures:
+            future.result()
+        for future in push_futures:
+            merge_worker_data(batch, future.result())
+
+    return queue_data
+
+
+async def solve_async(run_args, batch):
+    """ Solve all runs of the batch on a single event loop.
+
+        Up to --workers runs are in flight at the same time, sharing one
+        pool of keep-alive connections. The solver itself runs on the loop,
+        as it is short compared to the network round trips, unless it is
+        handed to the process pool.
+    """
+    import asyncio
+    import asynchttp
+
+    pool = asynchttp.ConnectionPool(run_args['server_url'],
+                                    run_args['workers_number'])
+    loop = asyncio.get_running_loop()
+    runs = iter_runs(batch)
+
+    async def worker():
+        for challenge in runs:
+            timing_instance = {
+                'total_start': time.perf_counter_ns()}
+
+            response = await pool.get(challenge_path(challenge))
+            timing_instance['fetch_end'] = time.perf_counter_ns()
+
+            if run_args['solve_in'] == "processes":
+                # Wait for the process pool without blocking the loop
+                solution_instance, phase_times = \
+                    await loop.run_in_executor(
+                        None, challenge['solve'], response.text)
+            else:
+                solution_instance, phase_times = \
+                    challenge['solve'](response.text)
+            timing_instance.update(phase_times)
+
+            timing_instance['post_start'] = time.perf_counter_ns()
+            solution_result = await pool.post(
+                solution_path(challenge), solution_instance)
 
-    timing_data = {
-        'total_start_time': time.time()}
+            verdict = register_solution(
+                challenge, challenge['run_data'], response.text,
+                solution_instance, solution_result.text)
 
-    solvefile = None
+            timing_instance['total_end'] = time.perf_counter_ns()
+            finish_run(challenge, challenge['run_data'], timing_instance,
+                       verdict)
 
+    workers = min(run_args['workers_number'],
+                  sum(challenge['runs'] for challenge in batch.values()))
     try:
-        solvefile = importlib.import_module(
-            'challenges.chall' + str(run_args['challenge_number']))
-    except ModuleNotFoundError:
-        sys.stderr.write("Error while starting solving of challenges: "
-                         + "This Challenge has no corresponding "
-                         + "solution file.\n")
-        sys.exit(105)
+        await asyncio.gather(*(worker() for _ in range(workers)))
+    finally:
+        await pool.close()
 
-    for i in range(run_args['runs_number']):
-        if(run_args['parallel_mode']):
-            _thread.start_new_thread(
-                solve_instance,
-                (run_args, run_data, timing_data, i, solvefile))
-        else:
-            sys.stdout.write("\rRunning Loop " + str(i + 1))
-            solve_instance(run_args, run_data, timing_data, i, solvefile)
 
-    while run_data['runs_in_progress'] or run_data['runs_awaiting']:
-        pass
+def solve_replay(run_args, batch):
+    """ Solve the recorded challenges of the batch without network access.
 
-    timing_data['total_end_time'] = time.time()
+        A solution counts as right or wrong if it is the same as the
+        recorded one, as the server would give the same verdict again.
+        A solution that differs from a wrong recorded one can not be
+        checked and is counted as unverified.
+    """
+    for challenge in batch.values():
+        run_data = challenge['run_data']
+        try:
+            reader = corpus.CorpusReader(run_args['replay_dir'],
+                                         challenge['number'])
+        except OSError as err:
+            raise StorageError("the corpus in " + run_args['replay_dir'],
+                               err) from err
+        with reader:
+            for i in range(challenge['runs']):
+                try:
+                    challenge_text, recorded_solution, verdict = \
+                        reader[i % len(reader)]
+                except OSError as err:
+                    raise StorageError("the corpus in "
+                                       + run_args['replay_dir'], err) from err
+
+                timing_instance = {
+                    'total_start': time.perf_counter_ns()}
+
+                solution_instance, phase_times = \
+                    challenge['solve'](challenge_text)
+                timing_instance.update(phase_times)
+
+                if same_solution(solution_instance, recorded_solution):
+                    replay_verdict = count_verdict(run_data, verdict)
+                elif "Error" not in verdict:
+                    run_data['wrong_solutions'] += 1
+                    run_data['runs_finished'] += 1
+                    replay_verdict = "wrong", None
+                else:
+                    run_data['unverified_solutions'] += 1
+                    run_data['runs_finished'] += 1
+                    replay_verdict = "unverified", None
+
+                timing_instance['total_end'] = time.perf_counter_ns()
+                finish_run(challenge, run_data, timing_instance,
+                           replay_verdict)
+
+
+_solver_numbers = None
+_solvers = {}
+_sessions = {}
+
+
+def solver_numbers():
+    """ Return the numbers of all challenges with a solution file. The
+        challenges directory is only searched once.
+    """
+    global _solver_numbers
+    if _solver_numbers is None:
+        numbers = []
+        for name in os.listdir(os.path.dirname(codec.__file__)):
+            match = re.fullmatch(r"chall(\d+)\.py", name)
+            if match:
+                numbers.append(int(match.group(1)))
+        _solver_numbers = sorted(numbers)
+    return list(_solver_numbers)
+
+
+def load_solver(challenge_number):
+    """ Import the solution file of a challenge and wrap it in a solver.
+        Solvers are cached, so every solution file is only imported once.
+    """
+    solver = _solvers.get(challenge_number)
+    if solver is None:
+        solver = codec.Solver(importlib.import_module(
+            'challenges.chall' + str(challenge_number)))
+        _solvers[challenge_number] = solver
+    return solver
+
+
+def shared_session(server_url, pool_size):
+    """ Return a session that stays open after the run, so the solver
+        daemon reuses its connections in the next jobs.
+    """
+    key = (server_url, pool_size)
+    if key not in _sessions:
+        _sessions[key] = create_session(server_url, pool_size)
+    return _sessions[key]
+
+
+def solve_challenges(run_args):
+    """ Take the argument dictionary and run the challenges
+        with the given settings.
+    """
+    import asyncio
+    import functools
+    import contextlib
+    import concurrent.futures.process
+    import requests
+    import asynchttp
+
+    batch = {}
+    queue_data = None
+
+    batch_data = {
+        'wall_start': time.perf_counter_ns(),
+        'cpu_start': time.process_time_ns()}
+
+    process_pool = None
+
+    for challenge_number in run_args['challenge_numbers']:
+        try:
+            solve_function = load_solver(challenge_number)
+        except ModuleNotFoundError:
+            sys.stderr.write("Error while starting solving of challenges: "
+                             + "Challenge " + str(challenge_number)
+                             + " has no corresponding solution file.\n")
+            sys.exit(105)
+        except ValueError as err:
+            sys.stderr.write("Error while starting solving of challenges: "
+                             + str(err) + "\n")
+            sys.exit(105)
+        batch[challenge_number] = {
+            'number': challenge_number,
+            'runs': run_args['challenge_runs'][challenge_number],
+            'solve': solve_function,
+            'corpus_writer': None,
+            'results_writer': None,
+            'run_data': new_run_data()}
+
+    if run_args['solve_in'] == "processes":
+        # One pool of processes, which imported all solution files, for
+        # the whole batch
+        process_pool = start_process_pool(run_args, list(batch))
+        for challenge in batch.values():
+            challenge['solve'] = functools.partial(
+                solve_on_pool, process_pool, challenge['number'])
+
+    results_writer = None
+    try:
+        if "record_dir" in run_args:
+            try:
+                for challenge in batch.values():
+                    challenge['corpus_writer'] = corpus.CorpusWriter(
+                        run_args['record_dir'], challenge['number'])
+            except OSError as err:
+                raise StorageError("the corpus in " + run_args['record_dir'],
+                                   err) from err
+
+        if run_args['save_raw_results']:
+            # One session in the results store for the whole batch
+            try:
+                results_writer = results.ResultsWriter()
+            except OSError as err:
+                raise StorageError("the results store in "
+                                   + results.DEFAULT_DIRECTORY, err) from err
+            for challenge in batch.values():
+                challenge['results_writer'] = results_writer
+
+        if "replay_dir" in run_args:
+            solve_replay(run_args, batch)
+        elif run_args['engine'] == "async":
+            asyncio.run(solve_async(run_args, batch))
+        else:
+            pool_size = run_args['workers_number']
+            if run_args['pipeline_mode']:
+                pool_size = run_args['stage_workers'][0] \
+                    + run_args['stage_workers'][2]
+            if run_args['keep_alive']:
+                session_context = contextlib.nullcontext(shared_session(
+                    run_args['server_url'], pool_size))
+            else:
+                session_context = create_session(run_args['server_url'],
+                                                 pool_size)
+            with session_context as session:
+                if run_args['pipeline_mode']:
+                    queue_data = solve_pipelined(run_args, batch, session)
+                elif run_args['parallel_mode']:
+                    solve_parallel(run_args, batch, session)
+                else:
+                    for challenge in batch.values():
+                        for i in range(challenge['runs']):
+                            sys.stdout.write(
+                                "\rRunning Loop " + str(i + 1)
+                                + (" of Challenge " + str(challenge['number'])
+                                   if len(batch) > 1 else ""))
+                            solve_instance(run_args, challenge,
+                                           challenge['run_data'], session)
+    except StorageError as err:
+        sys.stderr.write("\nError while solving challenges: " + str(err)
+                         + "\n")
+        sys.exit(108)
+    except concurrent.futures.process.BrokenProcessPool:
+        sys.stderr.write("\nError while solving challenges: "
+                         + "A solver process died unexpectedly.\n")
+        sys.exit(105)
+    except (requests.exceptions.RetryError, asynchttp.RetryError):
+        sys.stderr.write("\nError while solving challenges: "
+                         + "The challenge server kept answering with "
+                         + "429 Too Many Requests.\n")
+        sys.exit(104)
+    except (requests.exceptions.ConnectionError, OSError):
+        sys.stderr.write("\nError while solving challenges: "
+                         + "Could not connect to the challenge server.\n")
+        sys.exit(104)
+    finally:
+        if process_pool is not None:
+            process_pool.shutdown()
+        for challenge in batch.values():
+            if challenge['corpus_writer'] is not None:
+                challenge['corpus_writer'].close()
+        if results_writer is not None:
+            try:
+                # Writes the runs which are still buffered
+                results_writer.close()
+            except OSError as err:
+                sys.stderr.write("\nError while solving challenges: "
+                                 + str(StorageError(
+                                     "the results store in "
+                                     + results.DEFAULT_DIRECTORY, err))
+                                 + "\n")
+                sys.exit(108)
+
+    batch_data['wall_end'] = time.perf_counter_ns()
+    batch_data['cpu_end'] = time.process_time_ns()
+
+    # Counters of the whole batch
+    run_data = new_run_data()
+    for challenge in batch.values():
+        merge_run_data(run_data, challenge['run_data'])
 
     result_data = {
+        'batch': batch,
         'run_data': run_data,
-        'timing_data': timing_data}
+        'batch_data': batch_data,
+        'queue_data': queue_data}
 
     sys.stdout.write("\n")
     return result_data
 
 
 def parse_result(run_args, run_result):
-    """ Parse the results of all runs and create statistics
+    """ Parse the results of all runs and create statistics of the whole
+        batch and of every challenge. All durations are converted to
+        milliseconds.
     """
-
-    timing_data = run_result['timing_data']
-    run_data = run_result['run_data']
+    batch_data = run_result['batch_data']
+
+    def to_ms(nanoseconds):
+        return None if nanoseconds is None else nanoseconds / 1e6
+
+    def phase_statistics(run_statistics):
+        phases = {}
+        for phase, histogram in run_statistics.phases.items():
+            phases[phase] = {
+                'sum': to_ms(histogram.total),
+                'min': to_ms(histogram.minimum),
+                'max': to_ms(histogram.maximum),
+                'mean': to_ms(histogram.mean()),
+                'p50': to_ms(histogram.percentile(50)),
+                'p90': to_ms(histogram.percentile(90)),
+                'p99': to_ms(histogram.percentile(99)),
+                'p99.9': to_ms(histogram.percentile(99.9))}
+        return phases
 
     statistics = {
-        'total_delta': 0,
-        'runtime_delta': 0,
-        'total_quotdelta': 0,
-        'runtime_quotdelta': 0,
-        'best_inst_totaldelta': 1000000,
-        'worst_inst_totaldelta': -1,
-        'best_inst_rundelta': 1000000,
-        'worst_inst_rundelta': -1}
-
-    for i in range(run_args['runs_number']):
-        key = "c" + str(run_args['challenge_number']) + "r" + str(i)
-        timing_data[key]['total_delta'] = timing_data[key]['total_end'] - \
-            timing_data[key]['total_start']
-        if timing_data[key]['total_delta'] > \
-                statistics['worst_inst_totaldelta']:
-            statistics['worst_inst_totaldelta'] = \
-                timing_data[key]['total_delta']
-
-        if timing_data[key]['total_delta'] < \
-                statistics['best_inst_totaldelta']:
-            statistics['best_inst_totaldelta'] = \
-                timing_data[key]['total_delta']
-
-        timing_data[key]['run_delta'] = timing_data[key]['runtime_end'] - \
-            timing_data[key]['runtime_start']
-
-        if timing_data[key]['run_delta'] > \
-                statistics['worst_inst_rundelta']:
-            statistics['worst_inst_rundelta'] = timing_data[key]['run_delta']
-
-        if timing_data[key]['run_delta'] < \
-                statistics['best_inst_rundelta']:
-            statistics['best_inst_rundelta'] = timing_data[key]['run_delta']
-
-        statistics['runtime_delta'] += timing_data[key]['run_delta']
-        statistics['total_delta'] += timing_data[key]['total_delta']
-
-    statistics['total_quotdelta'] = statistics['total_delta'] / \
-        run_args['runs_number']
-    statistics['runtime_quotdelta'] = statistics['runtime_delta'] / \
-        run_args['runs_number']
+        'batch_wall': to_ms(batch_data['wall_end'] - batch_data['wall_start']),
+        'batch_cpu': to_ms(batch_data['cpu_end'] - batch_data['cpu_start']),
+        'phases': phase_statistics(run_result['run_data']['statistics']),
+        'challenges': {}}
+
+    statistics['throughput'] = run_result['run_data']['runs_finished'] \
+        / max(statistics['batch_wall'] / 1000, 1e-9)
+
+    for challenge_number, challenge in run_result['batch'].items():
+        statistics['challenges'][challenge_number] = {
+            'phases': phase_statistics(challenge['run_data']['statistics'])}
 
     return statistics
 
 
 def print_result(run_args, run_result, statistics):
-    """ Print results of the solving process.
+    """ Print results of the solving process for every challenge and, for a
+        batch of several challenges, for the whole batch.
         If benchmarking is enabled, print further information.
     """
-    print("\n------------------------------------------------------------")
-    print(
-        "Ergebnisse für Challenge "
-        + str(run_args['challenge_number']) + "\n")
-    print(
-        "Anzahl der Versuche: "
-        + str(run_args['runs_number']))
-    print(
-        "Anzahl der Fehlversuche: "
-        + str(run_result['run_data']['wrong_solutions']))
-    print(
-        "CTF-Token: "
-        + str(run_result['run_data']['ctf_token']))
-    if(run_args['benchmark_mode']):
+    batch = run_result['batch']
+
+    def format_ms(milliseconds):
+        return "-" if milliseconds is None \
+            else str(round(milliseconds, 6)) + "ms"
+
+    def print_batch_times():
+        print(
+            "                   Gesamtlaufzeit (Wand): "
+            + format_ms(statistics['batch_wall']))
+        print(
+            "                    Gesamtlaufzeit (CPU): "
+            + format_ms(statistics['batch_cpu']))
+        print(
+            "                               Durchsatz: "
+            + str(round(statistics['throughput'], 2)) + " Läufe/s\n")
+
+    def print_percentiles(label, values):
+        print(label.ljust(16) + "".join(
+            "{:>11.3f}".format(values[key])
+            for key in ('p50', 'p90', 'p99', 'p99.9')))
+
+    for challenge_number, challenge in batch.items():
+        run_data = challenge['run_data']
+        phases = statistics['challenges'][challenge_number]['phases']
+        print("\n------------------------------------------------------------")
+        print(
+            "Ergebnisse für Challenge "
+            + str(challenge_number) + "\n")
+        print(
+            "Anzahl der Versuche: "
+            + str(challenge['runs']))
+        print(
+            "Anzahl der Fehlversuche: "
+            + str(run_data['wrong_solutions']))
+        if run_data['unverified_solutions']:
+            print(
+                "Anzahl der nicht überprüfbaren Lösungen: "
+                + str(run_data['unverified_solutions']))
+        print(
+            "CTF-Token: "
+            + str(run_data['ctf_token']))
+        if not run_args['benchmark_mode']:
+            continue
+        total = phases['total']
+        solve = phases['solve']
         print()
         print(
             "                      Benchmark-Laufzeit: "
-            + str(round(statistics['total_delta'] * 1000, 6))
-            + "ms")
+            + format_ms(total['sum']))
         print(
             "                        Lösungs-Laufzeit: "
-            + str(round(statistics['runtime_delta'] * 1000, 6))
-            + "ms\n")
+            + format_ms(solve['sum']))
+        print(
+            "                   Dekodierungs-Laufzeit: "
+            + format_ms(phases['decode']['sum']))
+        print(
+            "                     Kodierungs-Laufzeit: "
+            + format_ms(phases['encode']['sum']))
+        print(
+            "                        Lösungs-CPU-Zeit: "
+            + format_ms(phases['solve_cpu']['sum']))
+        if len(batch) == 1:
+            print_batch_times()
+        else:
+            print()
         print(
             "         Kürzeste totale Instanzlaufzeit: "
-            + str(round(statistics['best_inst_totaldelta'] * 1000, 6))
-            + "ms")
+            + format_ms(total['min']))
         print(
             "          Längste totale Instanzlaufzeit: "
-            + str(round(statistics['worst_inst_totaldelta'] * 1000, 6))
-            + "ms")
+            + format_ms(total['max']))
         print(
             "Durchschnittliche totale Instanzlaufzeit: "
-            + str(round(statistics['total_quotdelta'] * 1000, 6))
-            + "ms\n")
+            + format_ms(total['mean']) + "\n")
         print(
             "                Kürzeste Instanzlaufzeit: "
-            + str(round(statistics['best_inst_rundelta'] * 1000, 6))
-            + "ms")
+            + format_ms(solve['min']))
         print(
             "                 Längste Instanzlaufzeit: "
-            + str(round(statistics['worst_inst_rundelta'] * 1000, 6))
-            + "ms")
+            + format_ms(solve['max']))
         print(
             "       Durchschnittliche Instanzlaufzeit: "
-            + str(round(statistics['runtime_quotdelta'] * 1000, 6))
-            + "ms")
+            + format_ms(solve['mean']))
+        print()
+        print("Perzentile in ms".ljust(16) + "".join(
+            "{:>11}".format(key) for key in ('p50', 'p90', 'p99', 'p99.9')))
+        for phase, label in (('fetch', "Abrufen"),
+                             ('decode', "Dekodieren"),
+                             ('solve', "Lösen"),
+                             ('encode', "Kodieren"),
+                             ('solve_cpu', "Lösen (CPU)"),
+                             ('post', "Senden"),
+                             ('total', "Gesamt")):
+            if phases[phase]['p50'] is None:
+                continue
+            print_percentiles(label, phases[phase])
+
+    if len(batch) > 1:
+        run_data = run_result['run_data']
+        print("\n------------------------------------------------------------")
+        print(
+            "Ergebnisse für Challenges "
+            + ", ".join(str(n) for n in batch) + "\n")
+        print(
+            "Anzahl der Versuche: "
+            + str(sum(challenge['runs'] for challenge in batch.values())))
+        print(
+            "Anzahl der Fehlversuche: "
+            + str(run_data['wrong_solutions']))
+        if run_data['unverified_solutions']:
+            print(
+                "Anzahl der nicht überprüfbaren Lösungen: "
+                + str(run_data['unverified_solutions']))
+        print(
+            "Challenges mit Fehlversuchen: "
+            + (", ".join(str(n) for n, challenge in batch.items()
+                         if challenge['run_data']['wrong_solutions'])
+               or "keine"))
+        if run_args['benchmark_mode']:
+            print()
+            print_batch_times()
+            print("Gesamt in ms".ljust(16) + "".join(
+                "{:>11}".format(key)
+                for key in ('p50', 'p90', 'p99', 'p99.9')))
+            for challenge_number in batch:
+                values = \
+                    statistics['challenges'][challenge_number]['phases']
+                print_percentiles("Challenge " + str(challenge_number),
+                                  values['total'])
+            print_percentiles("Alle", statistics['phases']['total'])
+
+    if run_args['benchmark_mode'] and run_result['queue_data'] is not None:
+        print()
+        for name, label in (('solve_queue', "Lösungs-Warteschlange"),
+                            ('push_queue', "   Push-Warteschlange")):
+            queue_stats = run_result['queue_data'][name]
+            mean_depth = queue_stats['depth_sum'] \
+                / max(queue_stats['samples'], 1)
+            print(
+                "                   " + label + ": "
+                + "max. " + str(queue_stats['max_depth'])
+                + ", Ø " + str(round(mean_depth, 2)))
     print("------------------------------------------------------------")
 
 
-def main():
-    """ Literally just the main function. Self explaining.
+class DaemonOutput:
+    """ File-like object of the solver daemon. Everything written to it is
+        sent to the client as a line of JSON, tagged with the stream name.
+    """
+
+    def __init__(self, stream, name, lock):
+        self.stream = stream
+        self.name = name
+        self.lock = lock
+
+    def write(self, text):
+        if not text or self.stream is None:
+            return len(text)
+        line = json.dumps({self.name: text}) + "\n"
+        with self.lock:
+            try:
+                self.stream.write(line.encode("utf-8"))
+                self.stream.flush()
+            except OSError:
+                # The client is gone, the job keeps running silently
+                self.stream = None
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def run_job(request, stream):
+    """ Run a single job of a client inside the solver daemon. The output of
+        the job is sent to the client. Returns the exit code of the job.
+    """
+    import traceback
+
+    lock = threading.Lock()
+    saved_output = sys.stdout, sys.stderr
+    saved_directory = os.getcwd()
+    sys.stdout = DaemonOutput(stream, "stdout", lock)
+    sys.stderr = DaemonOutput(stream, "stderr", lock)
+    try:
+        os.chdir(request['cwd'])
+        run_args = parse_arguments(request['arguments'])
+        run_args['keep_alive'] = True
+        return run(run_args)
+    except SystemExit as exit_status:
+        if exit_status.code is None or isinstance(exit_status.code, int):
+            return exit_status.code or 0
+        sys.stderr.write(str(exit_status.code) + "\n")
+        return 1
+    except Exception:
+        traceback.print_exc()
+        return 106
+    finally:
+        sys.stdout, sys.stderr = saved_output
+        os.chdir(saved_directory)
+
+
+def run_daemon(run_args):
+    """ Run the solver daemon. It imports all solution files and the network
+        modules once, then runs the jobs of its clients one after the other,
+        reusing its HTTP connections between the jobs.
+    """
+    import signal
+    import socket
+    import socketserver
+
+    socket_path = run_args['socket_path']
+    if not hasattr(socketserver, "UnixStreamServer"):
+        sys.stderr.write("Error while starting the daemon: Unix sockets "
+                         + "are not supported on this system.\n")
+        return 107
+
+    socket_directory = os.path.dirname(socket_path)
+    if socket_directory == private_socket_directory():
+        try:
+            os.mkdir(socket_directory, 0o700)
+        except FileExistsError:
+            pass
+        except OSError as err:
+            sys.stderr.write("Error while starting the daemon: " + str(err)
+                             + "\n")
+            return 107
+        # Somebody else may have created the directory first
+        if not owned_by_user(socket_directory, 0o077):
+            sys.stderr.write("Error while starting the daemon: "
+                             + socket_directory + " does not belong to you "
+                             + "or can be accessed by other users.\n")
+            return 107
+
+    if os.path.lexists(socket_path):
+        if not owned_by_user(socket_path):
+            sys.stderr.write("Error while starting the daemon: "
+                             + socket_path + " belongs to another user.\n")
+            return 107
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(socket_path)
+        except OSError:
+            # Left behind by a daemon that did not shut down cleanly
+            os.unlink(socket_path)
+        else:
+            sys.stderr.write("Error while starting the daemon: Another "
+                             + "daemon is listening on " + socket_path
+                             + ".\n")
+            return 107
+        finally:
+            probe.close()
+
+    # Import everything the jobs need now, so the first job is fast, too
+    import asyncio
+    import concurrent.futures.process
+    import requests
+    import asynchttp
+    for number in solver_numbers():
+        try:
+            load_solver(number)
+        except (ImportError, ValueError) as err:
+            sys.stderr.write("Warning while starting the daemon: Solution "
+                             + "file of challenge " + str(number)
+                             + " can not be loaded: " + str(err) + "\n")
+
+    class JobHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            try:
+                request = json.loads(self.rfile.readline())
+            except ValueError:
+                return
+            exit_code = run_job(request, self.wfile)
+            try:
+                self.wfile.write(
+                    (json.dumps({"exit": exit_code}) + "\n").encode("utf-8"))
+            except OSError:
+                pass
+
+    try:
+        server = socketserver.UnixStreamServer(socket_path, JobHandler)
+    except OSError as err:
+        sys.stderr.write("Error while starting the daemon: " + str(err)
+                         + "\n")
+        return 107
+    os.chmod(socket_path, 0o600)
+
+    def stop_daemon(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop_daemon)
+    sys.stdout.write("Solver daemon listening on " + socket_path + "\n")
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        sys.stdout.write("\nStopping solver daemon.\n")
+    finally:
+        server.server_close()
+        os.unlink(socket_path)
+        for session in _sessions.values():
+            session.close()
+    return 0
+
+
+def run_client(run_args):
+    """ Send the arguments to the solver daemon as a job and print the
+        output of the job while it runs. Returns the exit code of the job.
+    """
+    import socket
+    import struct
+
+    socket_path = run_args['socket_path']
+    arguments = []
+    skip = False
+    for argument in run_args['raw_arguments'][1:]:
+        if skip:
+            skip = False
+        elif argument == "--socket":
+            skip = True
+        else:
+            arguments.append(argument)
+
+    # The job carries the arguments and the working directory, so it is
+    # only sent to a daemon of the current user
+    if os.path.lexists(socket_path) and not owned_by_user(socket_path):
+        sys.stderr.write("Error while connecting to the daemon: "
+                         + socket_path + " belongs to another user.\n")
+        return 107
+
+    try:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(socket_path)
+    except (AttributeError, OSError):
+        sys.stderr.write("Error while connecting to the daemon: No daemon "
+                         + "is listening on " + socket_path
+                         + ". Start one with 'solve.py --daemon'.\n")
+        return 107
+
+    if hasattr(socket, "SO_PEERCRED"):
+        credentials = connection.getsockopt(
+            socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        _, peer_user, _ = struct.unpack("3i", credentials)
+        if peer_user != os.getuid():
+            connection.close()
+            sys.stderr.write("Error while connecting to the daemon: The "
+                             + "process listening on " + socket_path
+                             + " belongs to another user.\n")
+            return 107
+
+    request = {"arguments": arguments, "cwd": os.getcwd()}
+    with connection, connection.makefile("rb") as replies:
+        connection.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        for line in replies:
+            message = json.loads(line)
+            if "stdout" in message:
+                sys.stdout.write(message['stdout'])
+                sys.stdout.flush()
+            elif "stderr" in message:
+                sys.stderr.write(message['stderr'])
+            elif "exit" in message:
+                return message['exit']
+
+    sys.stderr.write("Error while connecting to the daemon: The daemon "
+                     + "closed the connection.\n")
+    return 107
+
+
+def run(run_args):
+    """ Check the parsed arguments, run the challenges and print the result.
     """
-    run_args = parse_arguments()
     check_arguments(run_args)
     interactive_pass(run_args)
     run_result = solve_challenges(run_args)
@@ -472,5 +1789,17 @@ def main():
     return 0
 
 
+def main():
+    """ Literally just the main function. Self explaining.
+    """
+    run_args = parse_arguments()
+    if run_args['daemon_mode'] or run_args['client_mode']:
+        check_arguments(run_args)
+        if run_args['daemon_mode']:
+            return run_daemon(run_args)
+        return run_client(run_args)
+    return run(run_args)
+
+
 if __name__ == "__main__":
     exit(main())
@@ -0,0 +1,141 @@
+"""
+Constant memory run statistics.
+
+Durations are counted in a log-linear histogram: values below 64ns are
+counted exactly, every larger power of two is split into 32 buckets. This
+keeps the error of every percentile below about 3%, no matter how many runs
+are counted, while a histogram never holds more than a few thousand buckets.
+Histograms of different workers can be merged.
+"""
+
+SUB_BUCKET_BITS = 5
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+PHASES = ("fetch", "decode", "solve", "encode", "post", "total", "solve_cpu")
+
+
+def bucket_index(value):
+    """ Index of the bucket counting the given non-negative integer.
+    """
+    if value < 2 * SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return (shift + 1) * SUB_BUCKETS + (value >> shift) - SUB_BUCKETS
+
+
+def bucket_bounds(index):
+    """ Smallest and largest value counted in the bucket with the given
+        index.
+    """
+    if index < 2 * SUB_BUCKETS:
+        return index, index
+    shift = index // SUB_BUCKETS - 1
+    mantissa = index % SUB_BUCKETS + SUB_BUCKETS
+    return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+
+class Histogram:
+    """ Mergeable histogram of non-negative integers.
+    """
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, value):
+        """ Count a single value.
+        """
+        index = bucket_index(value)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def merge(self, other):
+        """ Add all values counted in another histogram.
+        """
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.minimum is not None and (self.minimum is None
+                                          or other.minimum < self.minimum):
+            self.minimum = other.minimum
+        if other.maximum is not None and (self.maximum is None
+                                          or other.maximum > self.maximum):
+            self.maximum = other.maximum
+
+    def mean(self):
+        """ Mean of all values, or None if nothing was counted.
+        """
+        return self.total / self.count if self.count else None
+
+    def percentile(self, percent):
+        """ Value below which the given percentage of all values lies, or
+            None if nothing was counted.
+        """
+        if not self.count:
+            return None
+        rank = max(1, -(-self.count * percent // 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                lower, upper = bucket_bounds(index)
+                value = (lower + upper) // 2
+                return min(max(value, self.minimum), self.maximum)
+        return self.maximum
+
+
+def run_phases(timing_instance):
+    """ Durations of the phases of a finished run, in nanoseconds. The
+        timing_instance holds the perf_counter_ns() timestamps of the run
+        and the durations of the decode, solve and encode phases and the
+        solver CPU time. The fetch and post timestamps are missing in
+        replay mode, so are the fetch and post phases.
+    """
+    phases = {}
+    if 'fetch_end' in timing_instance:
+        phases['fetch'] = timing_instance['fetch_end'] \
+            - timing_instance['total_start']
+    for phase in ('decode', 'solve', 'encode'):
+        phases[phase] = timing_instance[phase]
+    if 'post_start' in timing_instance:
+        phases['post'] = timing_instance['total_end'] \
+            - timing_instance['post_start']
+    phases['total'] = timing_instance['total_end'] \
+        - timing_instance['total_start']
+    phases['solve_cpu'] = timing_instance['solve_cpu']
+    return phases
+
+
+class RunStatistics:
+    """ Histograms of all phases of the runs, in nanoseconds.
+
+        fetch, decode, solve, encode and post are the durations of the
+        phases of a run, total is the time from the start of fetching to the
+        end of pushing and solve_cpu is the CPU time used to decode, solve
+        and encode.
+    """
+
+    def __init__(self):
+        self.phases = {phase: Histogram() for phase in PHASES}
+
+    def add_phases(self, phases):
+        """ Count the phase durations of a finished run, as returned by
+            run_phases().
+        """
+        for phase, duration in phases.items():
+            self.phases[phase].add(duration)
+
+    def merge(self, other):
+        """ Merge the statistics of another worker.
+        """
+        for phase in PHASES:
+            self.phases[phase].merge(other.phases[phase])